@@ -0,0 +1,177 @@
+"""
+Admission control for Daisy DukeBot LLM calls: a global concurrency cap,
+per-user token buckets and a round-robin fair queue across users, so a burst
+of chat traffic is shed gracefully instead of tripping upstream rate limits
+"""
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+import logging
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; retry_after is in seconds"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take one token; returns 0 on success or the seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_queue: int = 64,
+        user_rate: float = 0.2,
+        user_burst: float = 3,
+        max_wait: float = 15.0,
+        max_buckets: int = 10000,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_wait = max_wait
+        self.max_buckets = max_buckets
+
+        self._active = 0
+        self._queued = 0
+        # user_id -> waiting futures; iteration order is the round-robin order
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._avg_hold = 2.0
+
+    def stats(self) -> Dict:
+        return {
+            "active": self._active,
+            "queued": self._queued,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue
+        }
+
+    @asynccontextmanager
+    async def slot(self, user_id: str):
+        """Hold one concurrency slot for the duration of the block"""
+        await self.acquire(user_id)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            # Exponentially weighted hold time feeds the Retry-After estimate
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * (time.monotonic() - started)
+            self.release()
+
+    async def acquire(self, user_id: str):
+        """Wait for a slot, or raise AdmissionRejected"""
+        immediate = self._active < self.max_concurrent and self._queued == 0
+        # Checked before the bucket so a request shed for a full queue doesn't cost the user a token
+        if not immediate and self._queued >= self.max_queue:
+            metrics.incr("chat.admission.rejected.queue_full")
+            raise AdmissionRejected("queue_full", self._estimate_wait())
+
+        wait = self._bucket(user_id).take()
+        if wait > 0:
+            metrics.incr("chat.admission.rejected.rate_limited")
+            raise AdmissionRejected("rate_limited", wait)
+
+        if immediate:
+            self._active += 1
+            metrics.incr("chat.admission.admitted")
+            metrics.observe("chat.admission.wait_ms", 0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(user_id, deque()).append(future)
+        self._queued += 1
+        enqueued = time.monotonic()
+
+        try:
+            await asyncio.wait_for(future, timeout=self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # Granted a slot just as we gave up; hand it on
+                self.release()
+            else:
+                self._remove_waiter(user_id, future)
+            if isinstance(e, asyncio.TimeoutError):
+                metrics.incr("chat.admission.rejected.timeout")
+                raise AdmissionRejected("queue_timeout", self._estimate_wait())
+            raise
+
+        metrics.incr("chat.admission.admitted")
+        metrics.observe("chat.admission.wait_ms", (time.monotonic() - enqueued) * 1000)
+
+    def try_acquire(self) -> bool:
+        """Take a spare slot without waiting or spending a user token; False if anyone is queued or none is free"""
+        if self._active < self.max_concurrent and self._queued == 0:
+            self._active += 1
+            return True
+        return False
+
+    def release(self):
+        """Release a slot and hand it to the next user in round-robin order"""
+        self._active -= 1
+        while self._waiters and self._active < self.max_concurrent:
+            user_id, waiters = next(iter(self._waiters.items()))
+            future = waiters.popleft()
+            self._queued -= 1
+            if waiters:
+                self._waiters.move_to_end(user_id)
+            else:
+                del self._waiters[user_id]
+            if future.done():
+                continue
+            self._active += 1
+            future.set_result(True)
+
+    def _remove_waiter(self, user_id: str, future: asyncio.Future):
+        waiters = self._waiters.get(user_id)
+        if waiters and future in waiters:
+            waiters.remove(future)
+            self._queued -= 1
+            if not waiters:
+                del self._waiters[user_id]
+
+    def _estimate_wait(self) -> float:
+        return (self._queued + 1) / self.max_concurrent * self._avg_hold
+
+    def _bucket(self, user_id: str) -> _TokenBucket:
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            if len(self._buckets) >= self.max_buckets:
+                self._prune_buckets()
+            bucket = self._buckets[user_id] = _TokenBucket(self.user_rate, self.user_burst)
+        return bucket
+
+    def _prune_buckets(self):
+        """Forget buckets idle long enough to have refilled completely"""
+        now = time.monotonic()
+        refill_time = self.user_burst / self.user_rate
+        for user_id in [u for u, b in self._buckets.items() if now - b.updated > refill_time]:
+            del self._buckets[user_id]
@@ -0,0 +1,180 @@
+"""
+Cold archival for idle Daisy DukeBot chat sessions. Sessions idle longer than
+the TTL are folded into one zlib-compressed document in chat_archives and
+removed from the hot chat_sessions/chat_messages collections, alongside a
+text-indexed list of the words they contain so archived chats stay
+searchable. Messages sent to an archived session are refused so the client
+moves to a fresh one.
+"""
+import asyncio
+import json
+import re
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from bson import Binary
+from motor.motor_asyncio import AsyncIOMotorDatabase
+import logging
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_CODEC = "zlib+json"
+
+
+def compress_messages(messages: List[Dict]) -> Binary:
+    """Pack chat messages into a compressed blob"""
+    payload = [
+        {
+            "content": msg.get("content"),
+            "is_bot": msg.get("is_bot", False),
+            "timestamp": msg["timestamp"].isoformat() if msg.get("timestamp") else None,
+            "error": msg.get("error", False)
+        }
+        for msg in messages
+    ]
+    return Binary(zlib.compress(json.dumps(payload, separators=(",", ":")).encode(), 9))
+
+
+def search_terms(messages: List[Dict]) -> str:
+    """Distinct lowercase words of the messages; the text-indexed projection of an archive"""
+    words = set()
+    for msg in messages:
+        words.update(re.findall(r"\w+", (msg.get("content") or "").lower()))
+    return " ".join(sorted(words))
+
+
+def decompress_messages(blob: bytes) -> List[Dict]:
+    """Unpack a compressed blob produced by compress_messages"""
+    return json.loads(zlib.decompress(blob).decode())
+
+
+class SessionArchived(Exception):
+    """Raised when a message is sent to a session that has been moved to chat_archives"""
+
+    def __init__(self, session_id: str):
+        super().__init__(f"Chat session {session_id} has been archived")
+        self.session_id = session_id
+
+
+class ChatSessionArchiver:
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        chat_writer=None,
+        memory=None,
+        idle_ttl: float = 6 * 3600,
+        interval: float = 300,
+        batch_size: int = 100,
+    ):
+        self.db = db
+        self.chat_writer = chat_writer
+        self.memory = memory
+        self.idle_ttl = idle_ttl
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the periodic archival sweep"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                archived = await self.sweep()
+                if archived:
+                    logger.info(f"Archived {archived} idle chat sessions")
+            except Exception as e:
+                logger.error(f"Chat session archival sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def sweep(self) -> int:
+        """Archive one batch of sessions idle past the TTL; returns how many were archived"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.idle_ttl)
+        idle = await self.db.chat_sessions.find(
+            {"last_activity": {"$lt": cutoff}}, {"_id": 0, "session_id": 1}
+        ).limit(self.batch_size).to_list(self.batch_size)
+        if not idle:
+            return 0
+
+        # Pending writes for these sessions must land before we read them back
+        if self.chat_writer is not None:
+            await self.chat_writer.flush()
+
+        archived = 0
+        for session in idle:
+            if await self.archive_session(session["session_id"], cutoff):
+                archived += 1
+        return archived
+
+    async def archive_session(self, session_id: str, cutoff: datetime) -> bool:
+        """Move one idle session into chat_archives; skipped if it saw activity since cutoff"""
+        # Retire the session first so lookup-or-create hands the user a fresh one
+        session = await self.db.chat_sessions.find_one_and_update(
+            {"session_id": session_id, "last_activity": {"$lt": cutoff}},
+            {"$set": {"active": False}}
+        )
+        if not session:
+            return False
+        # Drop the window now, not after the awaits below, so this worker stops accepting turns for it
+        if self.memory is not None:
+            self.memory.forget(session_id)
+
+        # Writes queued by a send that raced the retirement must land before the read below
+        if self.chat_writer is not None:
+            await self.chat_writer.flush()
+
+        messages = await self.db.chat_messages.find(
+            {"session_id": session_id}, {"_id": 0, "content": 1, "is_bot": 1, "timestamp": 1, "error": 1}
+        ).sort("timestamp", 1).to_list(None)
+
+        await self.db.chat_archives.replace_one(
+            {"session_id": session_id},
+            {
+                "session_id": session_id,
+                "user_id": session.get("user_id"),
+                "created_at": session.get("created_at"),
+                "last_activity": session.get("last_activity"),
+                "message_count": len(messages),
+                "archived_at": datetime.utcnow(),
+                "codec": ARCHIVE_CODEC,
+                "messages": compress_messages(messages),
+                "search_text": search_terms(messages)
+            },
+            upsert=True
+        )
+        await self.db.chat_messages.delete_many({"session_id": session_id})
+        await self.db.chat_sessions.delete_one({"session_id": session_id})
+        return True
+
+    async def is_archived(self, session_id: str) -> bool:
+        """Whether a session has been retired, including while its archive is still being written"""
+        session = await self.db.chat_sessions.find_one({"session_id": session_id}, {"_id": 0, "active": 1})
+        if session is not None:
+            return session.get("active") is False
+        return await self.db.chat_archives.count_documents({"session_id": session_id}, limit=1) > 0
+
+    async def load_archive(self, session_id: str) -> Optional[List[Dict]]:
+        """Return the archived messages of a session, or None if it was never archived"""
+        archive = await self.db.chat_archives.find_one({"session_id": session_id})
+        if not archive:
+            return None
+        return decompress_messages(archive["messages"])
+
+    async def search(self, user_id: str, query: str, limit: int) -> List[Tuple[float, str, List[Dict]]]:
+        """A user's archived sessions matching a text query as (score, session_id, messages), best first"""
+        archives = await self.db.chat_archives.find(
+            {"user_id": user_id, "$text": {"$search": query}},
+            {"score": {"$meta": "textScore"}, "session_id": 1, "messages": 1}
+        ).sort([("score", {"$meta": "textScore"})]).limit(limit).to_list(limit)
+        return [(archive["score"], archive["session_id"], decompress_messages(archive["messages"])) for archive in archives]
@@ -0,0 +1,88 @@
+"""
+Load generator for the Daisy DukeBot chat endpoint. Pair it with
+mock_llm_server.py to measure chat throughput, tool-loop behavior and tail
+latency on a disconnected machine:
+
+    python chat_loadgen.py --base-url http://localhost:8001/api --users 50 --messages 10
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from typing import Dict, List
+
+import httpx
+
+from metrics import percentile
+
+DEFAULT_MESSAGES = [
+    "Where's everyone at?",
+    "Any good tacos near the beach?",
+    "Who's playing right now?",
+    "When does Jason Aldean play?",
+    "What's the weather like?",
+    "Where can I find a bar near the festival?",
+    "Tell me something fun about Wildwood",
+    "How many people are in my group?",
+]
+
+
+async def _run_user(client: httpx.AsyncClient, base_url: str, user_index: int, messages: int,
+                    latencies: List[float], statuses: Counter):
+    user_id = f"loadgen_user_{user_index}"
+    response = await client.post(f"{base_url}/chat/session", json={"user_id": user_id})
+    session_id = response.json()["session_id"]
+
+    for _ in range(messages):
+        started = time.perf_counter()
+        try:
+            response = await client.post(
+                f"{base_url}/chat/{session_id}",
+                params={"user_id": user_id},
+                json={"message": random.choice(DEFAULT_MESSAGES)}
+            )
+            statuses[response.status_code] += 1
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def run(base_url: str, users: int, messages: int) -> Dict:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+
+    started = time.perf_counter()
+    async with httpx.AsyncClient(timeout=120) as client:
+        await asyncio.gather(*[
+            _run_user(client, base_url, i, messages, latencies, statuses) for i in range(users)
+        ])
+        elapsed = time.perf_counter() - started
+        server_metrics = (await client.get(f"{base_url}/metrics")).json()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "statuses": dict(statuses),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 1),
+            "p95": round(percentile(latencies, 95), 1),
+            "p99": round(percentile(latencies, 99), 1),
+            "max": round(latencies[-1], 1) if latencies else 0.0
+        },
+        "server_metrics": server_metrics
+    }
+
+
+if __name__ == "__main__":
+    import json
+
+    parser = argparse.ArgumentParser(description="Daisy DukeBot chat load generator")
+    parser.add_argument("--base-url", default="http://localhost:8001/api")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.base_url, args.users, args.messages)), indent=2))
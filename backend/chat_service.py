@@ -4,134 +4,199 @@ Daisy DukeBot Chat Service using emergentintegrations with function calling
 from emergentintegrations.llm.chat import LlmChat, UserMessage
 import uuid
 import os
-from typing import List, Dict, Optional
+import re
+import time
+import asyncio
+import base64
+from typing import Callable, List, Dict, Optional
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorClient
 import logging
 import json
 import requests
-from openai import OpenAI
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from openai import AsyncOpenAI
+from intent_router import IntentRouter
+from conversation_memory import ConversationMemory
+from chat_writer import ChatWriteBehind
+from admission_control import AdmissionController, AdmissionRejected
+from group_snapshot import GroupSnapshotCache
+from lineup_cache import LineupCache
+from chat_archiver import ChatSessionArchiver, SessionArchived
+from festival_knowledge import FestivalKnowledgeIndex
+from metrics import metrics
+from llm_hedging import HedgedCompletions
+from llm_ledger import CallLedger
 
 logger = logging.getLogger(__name__)
 
+# Functions available to the model
+TOOLS = [
+    {
+        "type": "function", 
+        "function": {
+            "name": "get_group_locations",
+            "description": "Get information about group members' locations and status",
+            "parameters": {"type": "object", "properties": {}}
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "search_web",
+            "description": "Search the web for current information about local businesses, restaurants, events, or attractions near the festival",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Search query for local information"
+                    }
+                },
+                "required": ["query"]
+            }
+        }
+    }
+]
+
+MAX_HISTORY_PAGE = 200
+MAX_SEARCH_RESULTS = 50
+SNIPPET_RADIUS = 60
+MAX_PROMPT_LOCATIONS = 50
+
+# Messages that will almost certainly need get_group_locations; that context is prefetched
+_GROUP_QUESTION_RE = re.compile(
+    r"\bwhere('?s| is| are)\b.*\b(everyone|everybody|group|crew|friends|squad|gang)\b"
+    r"|\b(find|locate|meet up with|meet)\b.*\b(my|our|the) (group|crew|friends|squad)\b"
+    r"|\bwho'?s (here|around|nearby)\b"
+)
+
+SYSTEM_PROMPT = "You are Daisy DukeBot, a helpful festival assistant for Barefoot Country Music Festival in Wildwood, NJ. You can access group location data and search for local information to help festival-goers."
+
 class DaisyDukeBotService:
-    def __init__(self, db_client: AsyncIOMotorClient):
+    def __init__(self, db_client: AsyncIOMotorClient, weather_service=None, group_snapshot: Optional[GroupSnapshotCache] = None,
+                 lineup_cache: Optional[LineupCache] = None):
         self.db_client = db_client
         self.db = db_client[os.environ['DB_NAME']]
+        self.weather_service = weather_service
+        self.group_snapshot = group_snapshot or GroupSnapshotCache(self.db)
+        # Router and knowledge index read the lineup through the shared /api/artists cache
+        self.lineup_cache = lineup_cache or LineupCache(self.db)
         self.openai_api_key = os.environ.get('OPENAI_API_KEY')
         
         if not self.openai_api_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
 
+        # OPENAI_BASE_URL / LANGSEARCH_BASE_URL can point at mock_llm_server.py for offline load tests
+        self.chat_model = os.environ.get('CHAT_MODEL', 'gpt-4o')
+        self.openai_client = AsyncOpenAI(
+            api_key=self.openai_api_key,
+            base_url=os.environ.get('OPENAI_BASE_URL') or None
+        )
+
+        # Every LLM and tool call lands in a batched ledger with minute rollups
+        self.ledger = CallLedger(self.db)
+
+        # Caps concurrent LLM work and queues users fairly during bursts
+        self.admission = AdmissionController(
+            max_concurrent=int(os.environ.get('CHAT_MAX_CONCURRENT_LLM', '8')),
+            max_queue=int(os.environ.get('CHAT_MAX_QUEUE', '64')),
+            user_rate=float(os.environ.get('CHAT_USER_RATE_PER_SEC', '0.2')),
+            user_burst=float(os.environ.get('CHAT_USER_BURST', '3'))
+        )
+
+        # Slow calls get a hedged duplicate (optionally to a cheaper model) when a spare admission
+        # slot is free; a request that blows the overall budget degrades to a local answer
+        self.completions = HedgedCompletions(
+            self.openai_client,
+            hedge_model=os.environ.get('CHAT_HEDGE_MODEL') or None,
+            hedge_percentile=float(os.environ.get('CHAT_HEDGE_PERCENTILE', '95')),
+            enabled=os.environ.get('CHAT_HEDGE_ENABLED', 'true').lower() == 'true',
+            ledger=self.ledger,
+            admission=self.admission
+        )
+        self.latency_budget = float(os.environ.get('CHAT_LATENCY_BUDGET', '20'))
+
         # Initialize LangSearch client for web search
         self.langsearch_key = os.environ.get('LANGSEARCH_API_KEY', '')
+        self.langsearch_url = os.environ.get('LANGSEARCH_BASE_URL', 'https://api.langsearch.com').rstrip('/') + "/v1/web-search"
         if self.langsearch_key:
             import httpx
-            self.search_client = httpx.AsyncClient()
+            self.search_client = httpx.AsyncClient(timeout=10)
 
-    def _get_weather_from_openai(self) -> Dict:
-        """Get weather data using OpenAI prompt API"""
-        try:
-            openai_client = OpenAI(api_key=self.openai_api_key)
-            
-            # Try the prompt response API
-            try:
-                response = openai_client.responses.create(
-                    prompt={
-                        "id": "pmpt_685238ede11881938cf93dbedcd19afa0c4dc65de6a4cfda",
-                        "version": "3"
-                    },
-                    input="Get current weather information for Wildwood, NJ festival",
-                    model="gpt-4o"
-                )
-                
-                weather_response = response.text if hasattr(response, 'text') else str(response)
-            except Exception as prompt_error:
-                logger.warning(f"Prompt API failed, trying completions API: {prompt_error}")
-                # Fallback to regular completions API with weather prompt
-                response = openai_client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are Daisy DukeBot providing weather information for Barefoot Country Music Festival in Wildwood, NJ. Use a friendly Southern style and provide current weather details."
-                        },
-                        {
-                            "role": "user",
-                            "content": "What's the current weather like at the festival location?"
-                        }
-                    ]
-                )
-                weather_response = response.choices[0].message.content
-            
-            return {
-                "weather_response": weather_response,
-                "source": "openai_prompt"
-            }
-        except Exception as e:
-            logger.error(f"Error getting weather from OpenAI prompt: {e}")
-            return {"error": "Weather data unavailable", "source": "openai_prompt"}
+        # Local router answers schedule/now-playing/headcount/weather without the LLM
+        self.intent_router = IntentRouter(
+            self.db, weather_service=weather_service, group_snapshot=self.group_snapshot, lineup_cache=self.lineup_cache
+        )
 
-    def _get_group_locations(self) -> Dict:
-        """Get current group location data"""
+        # Lineup/stage/venue facts retrieved into the system prompt
+        self.knowledge = FestivalKnowledgeIndex(self.db, lineup_cache=self.lineup_cache)
+
+        # Recent turns per session, kept in memory and trimmed to a token budget
+        self.memory = ConversationMemory(
+            self.db,
+            max_sessions=int(os.environ.get('CHAT_MEMORY_MAX_SESSIONS', '1000')),
+            token_budget=int(os.environ.get('CHAT_HISTORY_TOKEN_BUDGET', '2000')),
+            rolling_summary=os.environ.get('CHAT_ROLLING_SUMMARY', 'false').lower() == 'true'
+        )
+
+        # Chat messages and session activity are persisted write-behind in batches
+        self.chat_writer = ChatWriteBehind(
+            self.db,
+            flush_interval=float(os.environ.get('CHAT_WRITE_FLUSH_INTERVAL', '0.25'))
+        )
+
+        # Idle sessions are archived into one compressed document and dropped from the hot collections
+        self.archiver = ChatSessionArchiver(
+            self.db,
+            chat_writer=self.chat_writer,
+            memory=self.memory,
+            idle_ttl=float(os.environ.get('CHAT_SESSION_IDLE_TTL', str(6 * 3600))),
+            interval=float(os.environ.get('CHAT_ARCHIVE_INTERVAL', '300'))
+        )
+
+    async def _get_group_locations(self) -> Dict:
+        """Get current group location data from the shared snapshot"""
         try:
-            import asyncio
-            
-            async def fetch_locations():
-                locations = await self.db.user_locations.find({}).to_list(100)
-                total_users = len(locations)
-                visible_users = len([loc for loc in locations if not loc.get("ghost_mode", False)])
-                ghost_users = len([loc for loc in locations if loc.get("ghost_mode", False)])
-                
-                return {
-                    "total_users": total_users,
-                    "visible_users": visible_users,
-                    "ghost_users": ghost_users,
-                    "locations": [
-                        {
-                            "user_id": loc["user_id"],
-                            "latitude": loc.get("latitude"),
-                            "longitude": loc.get("longitude"),
-                            "ghost_mode": loc.get("ghost_mode", False)
-                        } for loc in locations if not loc.get("ghost_mode", False)
-                    ]
-                }
-            
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(fetch_locations())
-            loop.close()
-            
-            return result
+            return await self.group_snapshot.get()
         except Exception as e:
             logger.error(f"Error getting group locations: {e}")
             return {"error": "Location data unavailable"}
 
+    @staticmethod
+    def _compact_group(snapshot: Dict) -> Dict:
+        """Trim a group snapshot to what fits comfortably in a prompt"""
+        return {
+            "total_users": snapshot.get("total_users"),
+            "visible_users": snapshot.get("visible_users"),
+            "ghost_users": snapshot.get("ghost_users"),
+            "locations": snapshot.get("locations", [])[:MAX_PROMPT_LOCATIONS]
+        }
+
     async def _search_web_async(self, query: str) -> Dict:
         """Search the web using LangSearch API (async version)"""
         if not self.langsearch_key:
             return {"error": "Web search not available - no API key configured"}
         
         try:
-            import httpx
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.langsearch.com/v1/web-search",
-                    headers={
-                        "Authorization": f"Bearer {self.langsearch_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "query": f"{query} near Wildwood, NJ",
-                        "freshness": "oneYear",
-                        "summary": True,
-                        "count": 5
-                    },
-                    timeout=10
-                )
-                response.raise_for_status()
-                result = response.json()
+            response = await self.search_client.post(
+                self.langsearch_url,
+                headers={
+                    "Authorization": f"Bearer {self.langsearch_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "query": f"{query} near Wildwood, NJ",
+                    "freshness": "oneYear",
+                    "summary": True,
+                    "count": 5
+                },
+                timeout=10
+            )
+            response.raise_for_status()
+            result = response.json()
             
             # Extract relevant information
             search_summary = ""
@@ -139,15 +204,14 @@ class DaisyDukeBotService:
             # The LangSearch API returns data in data.webPages.value structure
             web_pages = result.get("data", {}).get("webPages", {}).get("value", [])
             
-            logger.info(f"LangSearch returned {len(web_pages)} results for query: {query}")
+            logger.debug(f"LangSearch returned {len(web_pages)} results")
             
             if web_pages:
                 # Get top 3 results summary
-                for i, page in enumerate(web_pages[:3]):
+                for page in web_pages[:3]:
                     name = page.get('name', 'No title')
                     snippet = page.get('snippet', 'No description')
                     search_summary += f"• **{name}**: {snippet}\n\n"
-                    logger.info(f"Result {i+1}: {name}")
             
             # Also check if there's a summary at the top level
             if result.get("data", {}).get("summary"):
@@ -158,228 +222,386 @@ class DaisyDukeBotService:
                 "result": search_summary if search_summary else "No specific results found, but try checking local directories or calling ahead."
             }
             
-            logger.info(f"Search function returning: {final_result}")
             return final_result
             
         except Exception as e:
             logger.error(f"Error in LangSearch web search: {e}")
             return {"query": query, "error": f"Search temporarily unavailable: {str(e)}"}
 
-    def _search_web(self, query: str) -> Dict:
-        """Search the web using LangSearch API (sync wrapper)"""
-        try:
-            import asyncio
-            
-            # Try to get existing event loop
+    async def get_or_create_session(self, user_id: str) -> Dict:
+        """Return the user's active chat session, creating one if needed"""
+        now = datetime.utcnow()
+        new_session_id = str(uuid.uuid4())
+
+        for attempt in range(2):
             try:
-                loop = asyncio.get_running_loop()
-                # If we're in an async context, we need to use run_in_executor
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, self._search_web_async(query))
-                    return future.result(timeout=15)
-            except RuntimeError:
-                # No loop running, we can create one
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                result = loop.run_until_complete(self._search_web_async(query))
-                loop.close()
-                return result
-                
-        except Exception as e:
-            logger.error(f"Error in web search wrapper: {e}")
-            return {"query": query, "error": f"Search temporarily unavailable: {str(e)}"}
-    
+                session = await self.db.chat_sessions.find_one_and_update(
+                    {"user_id": user_id, "active": True},
+                    {
+                        "$set": {"last_activity": now},
+                        "$setOnInsert": {
+                            "session_id": new_session_id,
+                            "created_at": now,
+                            "message_count": 0
+                        }
+                    },
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                    projection={"_id": 0, "session_id": 1}
+                )
+                break
+            except DuplicateKeyError:
+                # Lost an upsert race with a concurrent request for the same user; read theirs
+                if attempt:
+                    raise
 
-    async def create_chat_session(self, user_id: str) -> str:
-        """Create a new chat session for a user"""
-        session_id = str(uuid.uuid4())
-        
-        # Store session in database
-        session_data = {
-            "session_id": session_id,
-            "user_id": user_id,
-            "created_at": datetime.utcnow(),
-            "last_activity": datetime.utcnow(),
-            "message_count": 0
+        return {
+            "session_id": session["session_id"],
+            "created": session["session_id"] == new_session_id
         }
-        
-        await self.db.chat_sessions.insert_one(session_data)
-        return session_id
 
-    async def get_chat_history(self, session_id: str) -> List[Dict]:
-        """Get chat history for a session"""
+    async def ensure_indexes(self):
+        """Create the indexes chat reads rely on"""
+        # One active session per user, looked up on every chat panel open
+        await self.db.chat_sessions.create_index(
+            "user_id",
+            name="active_session_per_user",
+            unique=True,
+            partialFilterExpression={"active": True}
+        )
+        await self.db.chat_sessions.create_index("session_id", name="session_id")
+        await self.db.chat_sessions.create_index("last_activity", name="last_activity")
+        # Cold archives expire after the retention window
+        await self.db.chat_archives.create_index("session_id", name="session_id", unique=True)
+        await self.db.chat_archives.create_index(
+            [("user_id", 1), ("search_text", "text")],
+            name="user_search_text"
+        )
+        await self.db.chat_archives.create_index(
+            "archived_at",
+            name="archive_ttl",
+            expireAfterSeconds=int(float(os.environ.get('CHAT_ARCHIVE_RETENTION_DAYS', '30')) * 86400)
+        )
+        # Newest-first range scans per session; _id breaks timestamp ties for stable cursors
+        await self.db.chat_messages.create_index(
+            [("session_id", 1), ("timestamp", -1), ("_id", -1)],
+            name="session_timestamp"
+        )
+        # Per-user full-text search; the user_id prefix keeps each query to one user's messages
+        await self.db.chat_messages.create_index(
+            [("user_id", 1), ("content", "text")],
+            name="user_content_text"
+        )
+
+    @staticmethod
+    def _encode_cursor(msg: Dict) -> str:
+        raw = f"{msg['timestamp'].isoformat()}|{msg['_id']}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str):
+        """Decode a history cursor into (timestamp, ObjectId); raises ValueError if malformed"""
+        try:
+            timestamp, oid = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+            return datetime.fromisoformat(timestamp), ObjectId(oid)
+        except Exception:
+            raise ValueError("Invalid history cursor")
+
+    async def get_chat_history(self, session_id: str, before: Optional[str] = None, limit: int = 50) -> Dict:
+        """Get a page of chat history, newest first; pass next_cursor back as before for older messages"""
+        limit = max(1, min(limit, MAX_HISTORY_PAGE))
+        query = {"session_id": session_id}
+        if before:
+            timestamp, oid = self._decode_cursor(before)
+            query["$or"] = [
+                {"timestamp": {"$lt": timestamp}},
+                {"timestamp": timestamp, "_id": {"$lt": oid}}
+            ]
+
+        # Make sure queued writes are visible before reading them back
+        await self.chat_writer.flush()
         messages = await self.db.chat_messages.find(
-            {"session_id": session_id}
-        ).sort("timestamp", 1).to_list(100)
-        
-        return [
+            query, {"content": 1, "is_bot": 1, "timestamp": 1}
+        ).sort([("timestamp", -1), ("_id", -1)]).limit(limit + 1).to_list(limit + 1)
+
+        if not messages and not before:
+            # An archived session (e.g. opened from a search result) comes back whole
+            archived = await self.archiver.load_archive(session_id)
+            if archived is not None:
+                return {
+                    "messages": [
+                        {
+                            "id": f"{session_id}:{i}",
+                            "message": msg["content"],
+                            "isBot": msg["is_bot"],
+                            "timestamp": msg["timestamp"]
+                        }
+                        for i, msg in enumerate(archived)
+                    ],
+                    "next_cursor": None,
+                    "has_more": False
+                }
+
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        next_cursor = self._encode_cursor(messages[-1]) if has_more else None
+
+        # Page is fetched newest-first but returned in chronological order for display
+        return {
+            "messages": [
+                {
+                    "id": str(msg["_id"]),
+                    "message": msg["content"],
+                    "isBot": msg["is_bot"],
+                    "timestamp": msg["timestamp"].isoformat()
+                }
+                for msg in reversed(messages)
+            ],
+            "next_cursor": next_cursor,
+            "has_more": has_more
+        }
+
+    @staticmethod
+    def _snippet(content: str, terms: List[str], radius: int = SNIPPET_RADIUS) -> str:
+        """Cut a short excerpt of content around the first query term it contains"""
+        lowered = content.lower()
+        positions = [lowered.find(term) for term in terms]
+        positions = [pos for pos in positions if pos >= 0]
+        if not positions:
+            return content[:2 * radius] + ("…" if len(content) > 2 * radius else "")
+
+        start = max(0, min(positions) - radius)
+        end = min(len(content), min(positions) + radius)
+        return ("…" if start > 0 else "") + content[start:end].strip() + ("…" if end < len(content) else "")
+
+    async def search_chat_history(self, user_id: str, query: str, limit: int = 20) -> List[Dict]:
+        """Full-text search over a user's chat messages, archived sessions included, best matches first"""
+        limit = max(1, min(limit, MAX_SEARCH_RESULTS))
+        # Make sure queued writes are searchable
+        await self.chat_writer.flush()
+        messages = await self.db.chat_messages.find(
+            {"user_id": user_id, "$text": {"$search": query}},
+            {
+                "score": {"$meta": "textScore"},
+                "session_id": 1,
+                "content": 1,
+                "is_bot": 1,
+                "timestamp": 1
+            }
+        ).sort([("score", {"$meta": "textScore"})]).limit(limit).to_list(limit)
+
+        # Match snippets on word stems so "recommended" finds "recommend"
+        terms = [word.lower()[:max(4, len(word) - 3)] for word in re.findall(r"\w+", query) if len(word) > 2]
+        results = [
             {
                 "id": str(msg["_id"]),
-                "message": msg["content"],
+                "session_id": msg["session_id"],
                 "isBot": msg["is_bot"],
-                "timestamp": msg["timestamp"].isoformat()
+                "timestamp": msg["timestamp"].isoformat(),
+                "score": round(msg["score"], 3),
+                "snippet": self._snippet(msg["content"] or "", terms),
+                "archived": False
             }
             for msg in messages
         ]
 
-    async def send_message(self, session_id: str, user_message: str, user_id: str) -> Dict:
-        """Send a message to Daisy DukeBot and get response with function calling"""
+        # Archives are matched per session; their messages share the session's score,
+        # scaled by how many of the query terms each one contains
+        for score, session_id, archived in await self.archiver.search(user_id, query, limit):
+            for i, msg in enumerate(archived):
+                content = msg["content"] or ""
+                matched = sum(term in content.lower() for term in terms)
+                if not matched:
+                    continue
+                results.append({
+                    "id": f"{session_id}:{i}",
+                    "session_id": session_id,
+                    "isBot": msg["is_bot"],
+                    "timestamp": msg["timestamp"],
+                    "score": round(score * matched / len(terms), 3),
+                    "snippet": self._snippet(content, terms),
+                    "archived": True
+                })
+
+        results.sort(key=lambda result: result["score"], reverse=True)
+        return results[:limit]
+
+    async def _festival_context(self, user_message: str) -> str:
+        """Top festival facts for the message, or '' if none are relevant"""
         try:
-            # Store user message in database
-            user_msg_data = {
-                "session_id": session_id,
-                "user_id": user_id,
-                "content": user_message,
-                "is_bot": False,
-                "timestamp": datetime.utcnow()
-            }
-            await self.db.chat_messages.insert_one(user_msg_data)
+            await self.knowledge.refresh()
+            return self.knowledge.context_for(user_message)
+        except Exception as e:
+            logger.error(f"Error retrieving festival facts: {e}")
+            return ""
 
-            # Define available functions for OpenAI
-            tools = [
-                {
-                    "type": "function", 
-                    "function": {
-                        "name": "get_group_locations",
-                        "description": "Get information about group members' locations and status",
-                        "parameters": {"type": "object", "properties": {}}
-                    }
-                },
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "search_web",
-                        "description": "Search the web for current information about local businesses, restaurants, events, or attractions near the festival",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "query": {
-                                    "type": "string",
-                                    "description": "Search query for local information"
-                                }
-                            },
-                            "required": ["query"]
-                        }
-                    }
-                }
-            ]
+    async def _answer_with_llm(self, session_id: str, user_message: str) -> str:
+        """Answer the latest user turn with the chat model, executing any requested tool calls"""
+        # Speculatively fetch context the first completion would otherwise ask for via a tool
+        wants_group = bool(_GROUP_QUESTION_RE.search(user_message.lower().replace("\u2019", "'")))
+        if wants_group:
+            metrics.incr("chat.speculation.predicted")
+            festival_context, prefetched_group = await asyncio.gather(
+                self._festival_context(user_message), self._get_group_locations()
+            )
+            if "error" in prefetched_group:
+                prefetched_group = None
+        else:
+            festival_context, prefetched_group = await self._festival_context(user_message), None
 
-            # Create OpenAI client for function calling
-            openai_client = OpenAI(api_key=self.openai_api_key)
-            
-            # Check if this is a weather query (handle separately with OpenAI prompt)
-            weather_keywords = ["weather", "temperature", "rain", "sunny", "cloudy", "hot", "cold", "forecast"]
-            is_weather_query = any(keyword in user_message.lower() for keyword in weather_keywords)
-            
-            if is_weather_query:
-                # Handle weather query with OpenAI prompt
-                weather_data = self._get_weather_from_openai()
+        system_prompt = SYSTEM_PROMPT
+        if festival_context:
+            system_prompt += "\n\n" + festival_context
+        if prefetched_group is not None:
+            system_prompt += (
+                "\n\nCurrent group locations (already fetched, no need to call get_group_locations): "
+                + json.dumps(self._compact_group(prefetched_group))
+            )
+
+        # Build conversation from the in-memory window, trimmed to the token budget
+        conversation = self.memory.build_messages(session_id, system_prompt)
+
+        # Make request with function calling
+        response = await self.completions.create(
+            "tool_choice",
+            model=self.chat_model,
+            messages=conversation,
+            tools=TOOLS,
+            tool_choice="auto"
+        )
+
+        # Handle function calls
+        message = response.choices[0].message
+        if wants_group:
+            metrics.incr("chat.speculation.miss" if message.tool_calls else "chat.speculation.hit")
+        elif message.tool_calls:
+            metrics.incr("chat.speculation.unpredicted")
+        
+        if message.tool_calls:
+            # Execute function calls
+            for tool_call in message.tool_calls:
+                function_name = tool_call.function.name
+                arguments = json.loads(tool_call.function.arguments)
+                tool_started = time.monotonic()
+                cache_hit = None
                 
-                # Create a response that incorporates the weather data
-                if "error" not in weather_data:
-                    # Add the weather information to the conversation context
-                    conversation = [
-                        {
-                            "role": "system",
-                            "content": f"You are Daisy DukeBot, a helpful festival assistant for Barefoot Country Music Festival in Wildwood, NJ. The user asked about weather. Weather information: {weather_data.get('weather_response', 'Weather data available')}. Respond in a friendly Southern style and incorporate this weather information naturally."
-                        },
-                        {"role": "user", "content": user_message}
-                    ]
-                    
-                    response = openai_client.chat.completions.create(
-                        model="gpt-4o",
-                        messages=conversation
-                    )
-                    bot_response = response.choices[0].message.content
+                if function_name == "get_group_locations":
+                    cache_hit = prefetched_group is not None or self.group_snapshot.is_fresh()
+                    function_result = prefetched_group if prefetched_group is not None else await self._get_group_locations()
+                elif function_name == "search_web":
+                    function_result = await self._search_web_async(arguments["query"])
                 else:
-                    bot_response = "I'm havin' trouble gettin' the weather right now, sugar. But it's always a beautiful day for music at the beach!"
-            else:
-                # Handle other queries with function calling
-                # Get recent chat history for context
-                recent_messages = await self.db.chat_messages.find(
-                    {"session_id": session_id}
-                ).sort("timestamp", -1).limit(10).to_list(10)
-                
-                # Build conversation history
-                conversation = [
-                    {
-                        "role": "system",
-                        "content": "You are Daisy DukeBot, a helpful festival assistant for Barefoot Country Music Festival in Wildwood, NJ. You can access group location data and search for local information to help festival-goers."
-                    }
-                ]
-                
-                # Add recent conversation history (reverse to get chronological order)
-                for msg in reversed(recent_messages[1:]):  # Skip the current message
-                    role = "assistant" if msg["is_bot"] else "user"
-                    conversation.append({"role": role, "content": msg["content"]})
-                
-                # Add current user message
-                conversation.append({"role": "user", "content": user_message})
-
-                # Make request with function calling
-                response = openai_client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=conversation,
-                    tools=tools,
-                    tool_choice="auto"
-                )
+                    function_result = {"error": "Unknown function"}
 
-                # Handle function calls
-                message = response.choices[0].message
+                self.ledger.record(
+                    f"tool.{function_name}",
+                    (time.monotonic() - tool_started) * 1000,
+                    tool=function_name,
+                    cache_hit=cache_hit,
+                    error="error" in function_result
+                )
                 
-                if message.tool_calls:
-                    # Execute function calls
-                    for tool_call in message.tool_calls:
-                        function_name = tool_call.function.name
-                        arguments = json.loads(tool_call.function.arguments)
-                        
-                        if function_name == "get_group_locations":
-                            function_result = self._get_group_locations()
-                        elif function_name == "search_web":
-                            function_result = self._search_web(arguments["query"])
-                        else:
-                            function_result = {"error": "Unknown function"}
-                        
-                        # Add function result to conversation
-                        conversation.append({
-                            "role": "assistant",
-                            "content": None,
-                            "tool_calls": [tool_call]
-                        })
-                        conversation.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "content": json.dumps(function_result)
-                        })
-                    
-                    # Get final response with function results
-                    final_response = openai_client.chat.completions.create(
-                        model="gpt-4o",
-                        messages=conversation
+                # Add function result to conversation
+                conversation.append({
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [tool_call]
+                })
+                conversation.append({
+                    "role": "tool",
+                    "tool_call_id": tool_call.id,
+                    "content": json.dumps(function_result)
+                })
+            
+            # Get final response with function results
+            final_response = await self.completions.create(
+                "final",
+                model=self.chat_model,
+                messages=conversation
+            )
+            return final_response.choices[0].message.content
+
+        return message.content
+
+    async def _admitted_answer(self, session_id: str, user_message: str, user_id: str, on_admit: Callable[[], None]) -> str:
+        """Wait for an admission slot, record the user turn via on_admit, then answer with the model"""
+        async with self.admission.slot(user_id):
+            on_admit()
+            return await self._answer_with_llm(session_id, user_message)
+
+    def _degraded_answer(self, user_message: str) -> str:
+        """Best local answer when the model can't respond within the latency budget"""
+        facts = [fact for score, fact in self.knowledge.search(user_message, k=2) if score >= 1.0]
+        if facts:
+            return "I'm runnin' a little slow right now, sugar, but here's what I know:\n" + "\n".join(f"• {fact}" for fact in facts)
+        return "Whew, I'm plumb swamped right now, darlin'! Give me a minute and ask me again."
+
+    async def send_message(self, session_id: str, user_message: str, user_id: str) -> Dict:
+        """Send a message to Daisy DukeBot and get response with function calling"""
+        user_msg_data = {
+            "session_id": session_id,
+            "user_id": user_id,
+            "content": user_message,
+            "is_bot": False,
+            "timestamp": datetime.utcnow()
+        }
+        recorded = []
+
+        def record_user_turn():
+            """Queue the user message for persistence and add it to the window, once"""
+            if not recorded:
+                recorded.append(True)
+                self.chat_writer.add_message(user_msg_data)
+                self.memory.append(session_id, "user", user_message)
+
+        try:
+            # Warm the in-memory window on a miss, after any queued writes for it have landed
+            # Checked on every turn: another worker may be archiving a session this one still holds
+            if await self.archiver.is_archived(session_id):
+                raise SessionArchived(session_id)
+            if session_id not in self.memory:
+                await self.chat_writer.flush()
+                await self.memory.ensure_loaded(session_id)
+
+            # Answer common questions (schedule, now playing, headcount, weather) locally
+            route_started = time.monotonic()
+            routed = await self.intent_router.route(user_message)
+            intent = routed["intent"] if routed else None
+            if routed:
+                self.ledger.record(f"local.{intent}", (time.monotonic() - route_started) * 1000)
+
+            if routed:
+                record_user_turn()
+                bot_response = routed["response"]
+            else:
+                # Open-ended question: fall through to the model, subject to admission control
+                # and the overall latency budget. The user turn is only recorded once admitted,
+                # so a 429 leaves neither the history nor the prompt window with an unanswered turn
+                try:
+                    bot_response = await asyncio.wait_for(
+                        self._admitted_answer(session_id, user_message, user_id, record_user_turn),
+                        timeout=self.latency_budget
                     )
-                    bot_response = final_response.choices[0].message.content
-                else:
-                    bot_response = message.content
+                except asyncio.TimeoutError:
+                    metrics.incr("chat.budget_exceeded")
+                    record_user_turn()
+                    bot_response = self._degraded_answer(user_message)
+                    intent = "degraded"
 
-            # Store bot response in database
+            # Queue bot response for persistence
             bot_msg_data = {
                 "session_id": session_id,
                 "user_id": user_id,
                 "content": bot_response,
                 "is_bot": True,
-                "timestamp": datetime.utcnow()
+                "timestamp": datetime.utcnow(),
+                "intent": intent
             }
-            await self.db.chat_messages.insert_one(bot_msg_data)
+            self.chat_writer.add_message(bot_msg_data)
+            self.memory.append(session_id, "assistant", bot_response)
 
-            # Update session activity
-            await self.db.chat_sessions.update_one(
-                {"session_id": session_id},
-                {
-                    "$set": {"last_activity": datetime.utcnow()},
-                    "$inc": {"message_count": 2}  # user + bot message
-                }
-            )
+            # Update session activity (user + bot message)
+            self.chat_writer.bump_session(session_id, 2)
 
             return {
                 "id": str(uuid.uuid4()),
@@ -388,8 +610,20 @@ class DaisyDukeBotService:
                 "timestamp": datetime.utcnow().isoformat()
             }
 
+        except AdmissionRejected:
+            # Surfaced to the endpoint as 429 with Retry-After
+            raise
+        except SessionArchived:
+            # Surfaced to the endpoint as 410; the client starts a fresh session
+            raise
+        except asyncio.CancelledError:
+            # Client went away: in-flight LLM/tool work is cancelled and the reply is not persisted
+            metrics.incr("chat.cancelled")
+            logger.info(f"Chat request for session {session_id} cancelled by client disconnect")
+            raise
         except Exception as e:
             logger.error(f"Error in chat service: {e}")
+            record_user_turn()
             fallback_response = "I'm having some technical trouble right now. Please try again in a moment!"
             
             # Store fallback response
@@ -401,7 +635,7 @@ class DaisyDukeBotService:
                 "timestamp": datetime.utcnow(),
                 "error": True
             }
-            await self.db.chat_messages.insert_one(bot_msg_data)
+            self.chat_writer.add_message(bot_msg_data)
 
             return {
                 "id": str(uuid.uuid4()),
@@ -0,0 +1,130 @@
+"""
+Write-behind persistence for Daisy DukeBot chat.
+Chat messages and session activity bumps are queued in memory and flushed on a
+short interval as one insert_many plus one bulk_write, so request latency no
+longer includes MongoDB round trips.
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+import logging
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class ChatWriteBehind:
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        flush_interval: float = 0.25,
+        max_batch: int = 500,
+        max_pending: int = 20000,
+    ):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+
+        self._messages: List[Dict] = []
+        # session_id -> {"inc": int, "last_activity": datetime}
+        self._session_bumps: Dict[str, Dict] = {}
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def add_message(self, message: Dict):
+        """Queue a chat message document for insertion"""
+        self._messages.append(message)
+        if len(self._messages) >= self.max_batch:
+            self._wakeup.set()
+
+    def bump_session(self, session_id: str, message_count: int, last_activity: Optional[datetime] = None):
+        """Queue a session activity update; bumps for the same session are coalesced"""
+        bump = self._session_bumps.setdefault(session_id, {"inc": 0, "last_activity": None})
+        bump["inc"] += message_count
+        last_activity = last_activity or datetime.utcnow()
+        if bump["last_activity"] is None or last_activity > bump["last_activity"]:
+            bump["last_activity"] = last_activity
+
+    def pending(self) -> int:
+        """Number of queued writes not yet flushed"""
+        return len(self._messages) + len(self._session_bumps)
+
+    def start(self):
+        """Start the background flush loop"""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write everything still queued"""
+        self._stopping = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write all queued messages and session bumps to MongoDB"""
+        async with self._flush_lock:
+            messages, self._messages = self._messages, []
+            bumps, self._session_bumps = self._session_bumps, {}
+
+            if messages:
+                try:
+                    await self.db.chat_messages.insert_many(messages, ordered=False)
+                except BulkWriteError as e:
+                    # Unordered insert: only retry documents that failed for reasons other than
+                    # already being written (duplicate key)
+                    failed = [
+                        messages[error["index"]]
+                        for error in e.details.get("writeErrors", [])
+                        if error.get("code") != DUPLICATE_KEY_ERROR
+                    ]
+                    logger.error(f"Error flushing chat messages, retrying {len(failed)} of {len(messages)}: {e}")
+                    self._requeue_messages(failed)
+                except Exception as e:
+                    logger.error(f"Error flushing {len(messages)} chat messages: {e}")
+                    self._requeue_messages(messages)
+
+            if bumps:
+                operations = [
+                    UpdateOne(
+                        {"session_id": session_id},
+                        {
+                            "$set": {"last_activity": bump["last_activity"]},
+                            "$inc": {"message_count": bump["inc"]}
+                        }
+                    )
+                    for session_id, bump in bumps.items()
+                ]
+                try:
+                    await self.db.chat_sessions.bulk_write(operations, ordered=False)
+                except Exception as e:
+                    logger.error(f"Error flushing {len(operations)} chat session updates: {e}")
+                    for session_id, bump in bumps.items():
+                        self.bump_session(session_id, bump["inc"], bump["last_activity"])
+
+    def _requeue_messages(self, messages: List[Dict]):
+        """Put failed messages back in front of the queue, dropping the oldest beyond capacity"""
+        self._messages = messages + self._messages
+        overflow = len(self._messages) - self.max_pending
+        if overflow > 0:
+            logger.error(f"Chat write-behind queue full, dropping {overflow} oldest messages")
+            self._messages = self._messages[overflow:]
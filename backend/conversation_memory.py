@@ -0,0 +1,141 @@
+"""
+Per-session in-memory conversation window for Daisy DukeBot.
+Keeps a ring buffer of recent turns per session (LRU across sessions, warmed
+from MongoDB on a miss) and assembles prompts trimmed to a token budget.
+"""
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rough chars-per-token ratio for English chat text; good enough for budgeting
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+SUMMARY_SNIPPET_CHARS = 120
+
+
+def _tail(text: str, max_chars: int) -> str:
+    """Keep the newest max_chars of text, starting at a word boundary"""
+    if len(text) <= max_chars:
+        return text
+    tail = text[-max_chars:]
+    return tail.split(" ", 1)[1] if " " in tail else tail
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Cheap token estimate for prompt budgeting"""
+    return len(text or "") // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+
+
+class _SessionWindow:
+    def __init__(self, max_turns: int):
+        self.turns: Deque[Dict] = deque(maxlen=max_turns)
+        self.summary = ""
+
+
+class ConversationMemory:
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        max_sessions: int = 1000,
+        max_turns: int = 40,
+        token_budget: int = 2000,
+        rolling_summary: bool = False,
+        summary_token_budget: int = 300,
+    ):
+        self.db = db
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.rolling_summary = rolling_summary
+        self.summary_token_budget = summary_token_budget
+        self._sessions: "OrderedDict[str, _SessionWindow]" = OrderedDict()
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    async def ensure_loaded(self, session_id: str) -> _SessionWindow:
+        """Return the session window, warming it from MongoDB on a miss"""
+        window = self._sessions.get(session_id)
+        if window is not None:
+            self._sessions.move_to_end(session_id)
+            return window
+
+        window = _SessionWindow(self.max_turns)
+        try:
+            recent = await self.db.chat_messages.find(
+                {"session_id": session_id, "error": {"$ne": True}},
+                {"_id": 0, "content": 1, "is_bot": 1}
+            ).sort("timestamp", -1).limit(self.max_turns).to_list(self.max_turns)
+            for msg in reversed(recent):
+                role = "assistant" if msg.get("is_bot") else "user"
+                window.turns.append({"role": role, "content": msg.get("content") or ""})
+        except Exception as e:
+            logger.error(f"Error warming conversation window for {session_id}: {e}")
+
+        self._sessions[session_id] = window
+        self._evict()
+        return window
+
+    def append(self, session_id: str, role: str, content: str):
+        """Record a turn; turns pushed out of the ring buffer fold into the rolling summary"""
+        window = self._sessions.get(session_id)
+        if window is None:
+            window = _SessionWindow(self.max_turns)
+            self._sessions[session_id] = window
+            self._evict()
+        else:
+            self._sessions.move_to_end(session_id)
+
+        if self.rolling_summary and len(window.turns) == window.turns.maxlen:
+            window.summary = self._fold_into_summary(window.summary, [window.turns[0]])
+        window.turns.append({"role": role, "content": content or ""})
+
+    def build_messages(self, session_id: str, system_prompt: str) -> List[Dict]:
+        """Assemble system prompt + the newest turns that fit within the token budget"""
+        window = self._sessions.get(session_id)
+        turns = list(window.turns) if window else []
+
+        remaining = self.token_budget - estimate_tokens(system_prompt)
+        selected: List[Dict] = []
+        for turn in reversed(turns):
+            cost = estimate_tokens(turn["content"])
+            # Always keep the newest turn (the current user message)
+            if selected and cost > remaining:
+                break
+            selected.append(turn)
+            remaining -= cost
+        selected.reverse()
+
+        system_content = system_prompt
+        if self.rolling_summary and window:
+            dropped = turns[:len(turns) - len(selected)]
+            summary = self._fold_into_summary(window.summary, dropped)
+            summary_budget = min(self.summary_token_budget, remaining)
+            if summary and summary_budget > MESSAGE_OVERHEAD_TOKENS:
+                max_chars = (summary_budget - MESSAGE_OVERHEAD_TOKENS) * CHARS_PER_TOKEN
+                system_content += f"\n\nEarlier in this conversation: {_tail(summary, max_chars)}"
+
+        return [{"role": "system", "content": system_content}] + [
+            {"role": turn["role"], "content": turn["content"]} for turn in selected
+        ]
+
+    def forget(self, session_id: str):
+        """Drop a session window from memory"""
+        self._sessions.pop(session_id, None)
+
+    def _fold_into_summary(self, summary: str, turns: List[Dict]) -> str:
+        """Append condensed turns to a summary, keeping only the newest part within budget"""
+        for turn in turns:
+            speaker = "Daisy said" if turn["role"] == "assistant" else "User asked"
+            snippet = " ".join(turn["content"].split())[:SUMMARY_SNIPPET_CHARS]
+            summary = f"{summary} {speaker}: {snippet}.".strip()
+        max_chars = self.summary_token_budget * CHARS_PER_TOKEN
+        return _tail(summary, max_chars)
+
+    def _evict(self):
+        """Evict least recently used sessions beyond capacity"""
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
@@ -0,0 +1,74 @@
+"""
+Per-user favorite artists. Each user has one user_favorites document holding
+the artist ids they starred; a toggle is a single atomic pipeline update, so
+a crowd starring the headliner at once never contends on a shared document.
+"""
+import json
+from typing import Dict, List, Set, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+import logging
+
+from lineup_cache import LineupCache
+
+logger = logging.getLogger(__name__)
+
+
+class FavoritesService:
+    def __init__(self, db: AsyncIOMotorDatabase, lineup_cache: LineupCache):
+        self.db = db
+        self.lineup_cache = lineup_cache
+
+    async def ensure_indexes(self):
+        # Documents are keyed by user id; this one answers "who starred X"
+        await self.db.user_favorites.create_index("artist_ids", name="artist_ids")
+
+    async def toggle(self, user_id: str, artist_id: str) -> bool:
+        """Star or unstar an artist for a user in one round trip; returns the new state"""
+        starred = {"$ifNull": ["$artist_ids", []]}
+        artist = {"$literal": artist_id}
+        update = [{"$set": {
+            "artist_ids": {"$cond": [
+                {"$in": [artist, starred]},
+                {"$setDifference": [starred, [artist]]},
+                {"$concatArrays": [starred, [artist]]}
+            ]},
+            "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]},
+            "updated_at": "$$NOW"
+        }}]
+
+        for attempt in range(2):
+            try:
+                doc = await self.db.user_favorites.find_one_and_update(
+                    {"_id": user_id}, update,
+                    projection={"artist_ids": 1},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                return artist_id in doc["artist_ids"]
+            except DuplicateKeyError:
+                # Two first-ever toggles raced to create the document; the retry updates it
+                if attempt:
+                    raise
+
+    async def get(self, user_id: str) -> Tuple[List[str], int]:
+        """A user's starred artist ids and the favorites version"""
+        doc = await self.db.user_favorites.find_one({"_id": user_id}, {"artist_ids": 1, "version": 1})
+        if not doc:
+            return [], 0
+        return doc.get("artist_ids", []), doc.get("version", 0)
+
+    async def lineup_for(self, user_id: str) -> Tuple[str, List[Dict], Set[str]]:
+        """ETag, cached lineup and starred ids for a user's view of the lineup"""
+        lineup = await self.lineup_cache.get()
+        artist_ids, version = await self.get(user_id)
+        # Changes whenever the lineup or this user's favorites change
+        etag = f'{lineup.etag[:-1]}-{version}"'
+        return etag, lineup.artists, set(artist_ids)
+
+
+def encode_lineup(artists: List[Dict], starred: Set[str]) -> bytes:
+    """Serialize the lineup with isStarred set from a user's favorites"""
+    merged = [{**artist, "isStarred": artist["id"] in starred} for artist in artists]
+    return json.dumps({"artists": merged}, ensure_ascii=False, separators=(",", ":")).encode()
@@ -0,0 +1,33 @@
+"""
+Festival clock and calendar. Set times are stored as naive festival-local
+datetimes, and the festival's dates are derived from the lineup file, so the
+chat router, weather service and API share one clock and one weekend.
+"""
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Tuple
+from zoneinfo import ZoneInfo
+
+from lineup_loader import LINEUP_PATH, load_lineup_file
+
+FESTIVAL_TZ = ZoneInfo("America/New_York")
+
+
+def festival_now() -> datetime:
+    """Current wall-clock time at the festival, naive like the stored set times"""
+    return datetime.now(FESTIVAL_TZ).replace(tzinfo=None)
+
+
+@lru_cache(maxsize=None)
+def festival_dates(path: Path = LINEUP_PATH) -> Tuple[date, date]:
+    """First and last day with a set in the lineup file"""
+    artists, _ = load_lineup_file(path)
+    starts = [datetime.fromisoformat(artist["startTime"]) for artist in artists]
+    return min(starts).date(), max(starts).date()
+
+
+def festival_days(path: Path = LINEUP_PATH) -> List[str]:
+    """Weekday names of the festival, in order"""
+    start, end = festival_dates(path)
+    return [(start + timedelta(days=i)).strftime("%A") for i in range((end - start).days + 1)]
@@ -0,0 +1,149 @@
+"""
+In-process BM25 index over festival facts (lineup, stages, venue) built from
+the artists collection. Top hits are injected into Daisy's system prompt so
+festival questions are answered in one model call without a web search.
+"""
+import hashlib
+import math
+import re
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+import logging
+
+from festival_calendar import festival_dates
+
+logger = logging.getLogger(__name__)
+
+_START, _END = festival_dates()
+
+VENUE_FACTS = [
+    f"Barefoot Country Music Fest is held on the beach in Wildwood, New Jersey, "
+    f"{_START:%A %B} {_START.day} through {_END:%A %B} {_END.day}, {_END.year}.",
+    "The festival has two stages on the sand: the Coors Light Main Stage and the Patrón Tequila Stage.",
+    "Headliners close out each night on the Coors Light Main Stage.",
+]
+
+STOPWORDS = {
+    "a", "an", "and", "are", "at", "be", "do", "does", "for", "from", "i", "in", "is", "it",
+    "me", "my", "of", "on", "or", "the", "to", "was", "we", "what", "who", "will", "with", "you",
+}
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, fold accents and split into terms, dropping stopwords"""
+    normalized = unicodedata.normalize("NFKD", text or "")
+    folded = "".join(ch for ch in normalized if not unicodedata.combining(ch)).lower()
+    return [t for t in _TOKEN_RE.findall(folded) if t not in STOPWORDS]
+
+
+def _format_time(dt: datetime) -> str:
+    return dt.strftime("%I:%M %p").lstrip("0")
+
+
+def build_lineup_facts(artists: List[Dict]) -> List[str]:
+    """Turn lineup documents into short natural-language facts"""
+    facts = list(VENUE_FACTS)
+    by_day_stage: Dict[Tuple[str, str], List[Tuple[datetime, str]]] = defaultdict(list)
+
+    for artist in artists:
+        try:
+            start = datetime.fromisoformat(artist["startTime"])
+            end = datetime.fromisoformat(artist["endTime"])
+        except (KeyError, ValueError):
+            continue
+        facts.append(
+            f"{artist['name']} plays the {artist['stage']} on {artist.get('day', start.strftime('%A'))} "
+            f"{start.strftime('%B')} {start.day} from {_format_time(start)} to {_format_time(end)}."
+        )
+        by_day_stage[(artist.get("day", start.strftime("%A")), artist["stage"])].append((start, artist["name"]))
+
+    for (day, stage), sets in by_day_stage.items():
+        sets.sort()
+        order = ", ".join(f"{name} ({_format_time(start)})" for start, name in sets)
+        facts.append(f"{day} on the {stage}: {order}. {sets[-1][1]} closes the night.")
+
+    return facts
+
+
+class FestivalKnowledgeIndex:
+    def __init__(self, db: AsyncIOMotorDatabase, refresh_ttl: float = 60.0, k1: float = 1.5, b: float = 0.75,
+                 lineup_cache=None):
+        self.db = db
+        # Shared LineupCache; when set, its ETag is the index signature
+        self.lineup_cache = lineup_cache
+        self.refresh_ttl = refresh_ttl
+        self.k1 = k1
+        self.b = b
+
+        self.signature: Optional[str] = None
+        self._facts: List[str] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._doc_lengths: List[int] = []
+        self._avg_length = 0.0
+        self._checked_at = 0.0
+
+    async def refresh(self, force: bool = False):
+        """Rebuild the index if the lineup changed since the last build"""
+        if self.lineup_cache is not None:
+            entry = await self.lineup_cache.get()
+            artists, signature = entry.artists, entry.etag
+        else:
+            if not force and self._facts and time.monotonic() - self._checked_at < self.refresh_ttl:
+                return
+            self._checked_at = time.monotonic()
+            artists = await self.db.artists.find(
+                {}, {"_id": 0, "id": 1, "name": 1, "stage": 1, "day": 1, "startTime": 1, "endTime": 1}
+            ).to_list(1000)
+            artists = sorted(artists, key=lambda a: str(a.get("id")))
+            signature = hashlib.sha1(repr(artists).encode()).hexdigest()
+        if signature != self.signature:
+            self.build(build_lineup_facts(artists))
+            self.signature = signature
+            logger.info(f"Rebuilt festival knowledge index with {len(self._facts)} facts")
+
+    def build(self, facts: List[str]):
+        """Build the inverted index over a list of fact strings"""
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        doc_lengths = []
+        for doc_id, fact in enumerate(facts):
+            terms = tokenize(fact)
+            doc_lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                postings[term].append((doc_id, tf))
+
+        self._facts = facts
+        self._postings = dict(postings)
+        self._doc_lengths = doc_lengths
+        self._avg_length = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[float, str]]:
+        """Return up to k (score, fact) pairs ranked by BM25"""
+        if not self._facts:
+            return []
+
+        n_docs = len(self._facts)
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / self._avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(score, self._facts[doc_id]) for doc_id, score in ranked]
+
+    def context_for(self, query: str, k: int = 5, min_score: float = 1.0) -> str:
+        """Format the top hits as a block for the system prompt, or '' if nothing relevant"""
+        hits = [fact for score, fact in self.search(query, k) if score >= min_score]
+        if not hits:
+            return ""
+        return "Festival facts (authoritative, use these for lineup, stage and set time questions instead of searching the web):\n" + "\n".join(f"- {fact}" for fact in hits)
@@ -0,0 +1,176 @@
+"""
+Group consensus schedule. Each member's favorites become a row of 64-bit
+words over lineup positions; per-set interest counts come from bit-sliced
+column popcounts over the whole member matrix, and the group itinerary is the
+weighted interval plan with each set weighted by how many members want it.
+Member rows are cached per user and favorites version, so a miss only packs
+the rows of members whose stars changed; results are cached per group and
+dropped when a member's stars change.
+"""
+import hashlib
+import time
+from collections import OrderedDict, defaultdict
+from itertools import chain
+from typing import Dict, List, Set, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+import numpy as np
+import logging
+
+from itinerary import plan_itinerary
+from metrics import metrics
+from schedule_index import ScheduleIndex
+
+logger = logging.getLogger(__name__)
+
+_BIT_SHIFTS = np.arange(64, dtype=np.uint64)
+
+
+def favorites_matrix(rows: List[List[int]], n_sets: int) -> np.ndarray:
+    """Pack each member's set positions into a (members, words) uint64 bitset matrix"""
+    words = max(1, (n_sets + 63) // 64)
+    matrix = np.zeros((len(rows), words), dtype=np.uint64)
+    lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+    if lengths.sum() == 0:
+        return matrix
+    member = np.repeat(np.arange(len(rows)), lengths)
+    position = np.fromiter(chain.from_iterable(rows), dtype=np.uint64, count=int(lengths.sum()))
+    np.bitwise_or.at(matrix, (member, (position // 64).astype(np.int64)), np.uint64(1) << (position % np.uint64(64)))
+    return matrix
+
+
+def interest_counts(matrix: np.ndarray, n_sets: int) -> np.ndarray:
+    """How many members starred each set: a popcount down every bit column at once"""
+    bits = (matrix[:, :, None] >> _BIT_SHIFTS) & np.uint64(1)
+    return bits.sum(axis=0, dtype=np.int64).reshape(-1)[:n_sets]
+
+
+def member_popcounts(matrix: np.ndarray) -> np.ndarray:
+    """Number of starred sets per member"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(matrix).sum(axis=1)
+    # numpy < 2.0: count across the bit slices instead
+    return ((matrix[:, :, None] >> _BIT_SHIFTS) & np.uint64(1)).sum(axis=(1, 2), dtype=np.int64)
+
+
+class GroupConsensus:
+    def __init__(self, db: AsyncIOMotorDatabase, ttl: float = 30.0, max_groups: int = 512, max_rows: int = 50000):
+        self.db = db
+        # Bounds staleness from star changes made on other workers
+        self.ttl = ttl
+        self.max_groups = max_groups
+        self.max_rows = max_rows
+        # user_id -> (lineup version, favorites version, packed row), least recently used first
+        self._rows: "OrderedDict[str, Tuple[str, int, np.ndarray]]" = OrderedDict()
+        # (group_id, members digest) -> (lineup version, expires_at, result, members)
+        self._results: Dict[Tuple[str, str], Tuple[str, float, Dict, List[str]]] = {}
+        # Reverse index over cached results only, so it shrinks as results are dropped
+        self._keys_by_user: Dict[str, Set[Tuple[str, str]]] = defaultdict(set)
+
+    def invalidate_user(self, user_id: str):
+        """Drop the user's row and cached results for every group they belong to; called after a star toggle"""
+        self._rows.pop(user_id, None)
+        for key in list(self._keys_by_user.get(user_id, ())):
+            self._drop(key)
+
+    def _drop(self, key: Tuple[str, str]):
+        """Remove a cached result and its reverse-index entries"""
+        entry = self._results.pop(key, None)
+        if entry is None:
+            return
+        for member in entry[3]:
+            keys = self._keys_by_user.get(member)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_user[member]
+
+    async def schedule(self, group_id: str, members: List[str], index: ScheduleIndex, limit: int = 10) -> Dict:
+        """Ranked shared sets and a group itinerary for the given members"""
+        members = sorted(set(members))
+        # A digest keeps keys cheap to hash however large the group is
+        key = (group_id, hashlib.sha1("\0".join(members).encode()).hexdigest())
+        cached = self._results.get(key)
+        if cached is not None and cached[0] == index.version and time.monotonic() < cached[1]:
+            metrics.incr("group_consensus.cache.hit")
+            return self._trim(cached[2], limit)
+        metrics.incr("group_consensus.cache.miss")
+
+        result = await self._compute(group_id, members, index)
+        self._drop(key)
+        if len(self._results) >= self.max_groups:
+            self._drop(next(iter(self._results)))
+        self._results[key] = (index.version, time.monotonic() + self.ttl, result, members)
+        for member in members:
+            self._keys_by_user[member].add(key)
+        return self._trim(result, limit)
+
+    @staticmethod
+    def _trim(result: Dict, limit: int) -> Dict:
+        return {**result, "shared_sets": result["shared_sets"][:limit]}
+
+    async def _compute(self, group_id: str, members: List[str], index: ScheduleIndex) -> Dict:
+        sets = index.all.sets
+        matrix = await self._member_matrix(members, index)
+        counts = interest_counts(matrix, len(sets))
+        engaged = int(np.count_nonzero(member_popcounts(matrix))) if len(matrix) else 0
+
+        # Most wanted first; ties broken by start time (sets are already in start order)
+        ranked = np.argsort(-counts, kind="stable")
+        ranked = ranked[counts[ranked] > 0]
+        size = max(len(members), 1)
+        shared = [
+            {**sets[i].to_dict(), "count": int(counts[i]), "share": round(int(counts[i]) / size, 3)}
+            for i in ranked.tolist()
+        ]
+
+        position = {s.id: i for i, s in enumerate(sets)}
+        wanted = [sets[i] for i in ranked.tolist()]
+        plan, score = plan_itinerary(wanted, {s.id: int(counts[position[s.id]]) for s in wanted})
+        itinerary = [{**s.to_dict(), "count": int(counts[position[s.id]])} for s in plan]
+
+        return {
+            "group_id": group_id,
+            "members": len(members),
+            "members_with_favorites": engaged,
+            "shared_sets": shared,
+            "itinerary": itinerary,
+            "score": score
+        }
+
+    async def _member_matrix(self, members: List[str], index: ScheduleIndex) -> np.ndarray:
+        """Stack the members' cached rows, packing fresh ones only for members whose stars changed"""
+        words = max(1, (len(index.all.sets) + 63) // 64)
+        # Versions only: one small read tells which cached rows are still current
+        versions = {
+            doc["_id"]: doc.get("version", 0)
+            for doc in await self.db.user_favorites.find({"_id": {"$in": members}}, {"version": 1}).to_list(None)
+        }
+        stale = [
+            user_id for user_id, version in versions.items()
+            if self._rows.get(user_id, (None, None))[:2] != (index.version, version)
+        ]
+        metrics.incr("group_consensus.rows.hit", len(versions) - len(stale))
+        metrics.incr("group_consensus.rows.miss", len(stale))
+
+        if stale:
+            position = {s.id: i for i, s in enumerate(index.all.sets)}
+            docs = await self.db.user_favorites.find(
+                {"_id": {"$in": stale}}, {"artist_ids": 1, "version": 1}
+            ).to_list(None)
+            packed = favorites_matrix(
+                [[position[a] for a in doc.get("artist_ids", []) if a in position] for doc in docs],
+                len(index.all.sets)
+            )
+            for doc, row in zip(docs, packed):
+                self._rows[doc["_id"]] = (index.version, doc.get("version", 0), row)
+                self._rows.move_to_end(doc["_id"])
+
+        rows = []
+        for user_id in versions:
+            cached = self._rows.get(user_id)
+            if cached is not None:
+                self._rows.move_to_end(user_id)
+                rows.append(cached[2])
+        while len(self._rows) > self.max_rows:
+            self._rows.popitem(last=False)
+        return np.stack(rows) if rows else np.zeros((0, words), dtype=np.uint64)
@@ -0,0 +1,84 @@
+"""
+Shared, versioned snapshot of group locations. One user_locations scan serves
+every concurrent "where is everyone?" question until the TTL lapses or a
+location write bumps the version.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class GroupSnapshotCache:
+    def __init__(self, db: AsyncIOMotorDatabase, ttl: float = 5.0):
+        self.db = db
+        self.ttl = ttl
+        self.version = 0
+        # user_locations carries no group field, so every group_id shares one
+        # snapshot: (version, expires_at, snapshot)
+        self._entry: Optional[Tuple[int, float, Dict]] = None
+        # (version, task) of the scan in flight
+        self._inflight: Optional[Tuple[int, asyncio.Task]] = None
+
+    def invalidate(self):
+        """Mark the cached snapshot stale; called after location writes"""
+        self.version += 1
+
+    def is_fresh(self, group_id: str = "default") -> bool:
+        """Whether get() would be served from cache right now"""
+        entry = self._entry
+        return entry is not None and entry[0] == self.version and time.monotonic() < entry[1]
+
+    async def get(self, group_id: str = "default") -> Dict:
+        """Return the group snapshot, refreshing it with a single in-flight scan when stale"""
+        if self.is_fresh(group_id):
+            snapshot = self._entry[2]
+        else:
+            # A scan started before the latest write may miss it, so only join one for this version
+            if self._inflight is None or self._inflight[0] != self.version:
+                # Detached so one caller being cancelled can't cancel the scan for the rest
+                task = asyncio.create_task(self._refresh(self.version))
+                task.add_done_callback(self._refresh_done)
+                self._inflight = (self.version, task)
+            snapshot = await asyncio.shield(self._inflight[1])
+        return {**snapshot, "group_id": group_id}
+
+    async def _refresh(self, version: int) -> Dict:
+        snapshot = await self._build(version)
+        # An older scan finishing late must not replace a newer snapshot
+        if self._entry is None or self._entry[0] <= version:
+            self._entry = (version, time.monotonic() + self.ttl, snapshot)
+        return snapshot
+
+    def _refresh_done(self, task: asyncio.Task):
+        if self._inflight is not None and self._inflight[1] is task:
+            self._inflight = None
+        # Every waiter may have been cancelled; don't let the loop warn about an unretrieved exception
+        if not task.cancelled():
+            task.exception()
+
+    async def _build(self, version: int) -> Dict:
+        locations = await self.db.user_locations.find(
+            {}, {"_id": 0, "user_id": 1, "latitude": 1, "longitude": 1, "ghost_mode": 1}
+        ).to_list(1000)
+
+        visible = [loc for loc in locations if not loc.get("ghost_mode", False)]
+        return {
+            "version": version,
+            "generated_at": datetime.utcnow().isoformat(),
+            "total_users": len(locations),
+            "visible_users": len(visible),
+            "ghost_users": len(locations) - len(visible),
+            "locations": [
+                {
+                    "user_id": loc["user_id"],
+                    "latitude": loc.get("latitude"),
+                    "longitude": loc.get("longitude"),
+                    "ghost_mode": False
+                } for loc in visible
+            ]
+        }
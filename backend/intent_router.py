@@ -0,0 +1,310 @@
+"""
+Local intent router for Daisy DukeBot - answers common festival questions
+(schedule, now playing, group headcount, weather) from local data so they
+never need a round trip to the LLM
+"""
+import re
+import time
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+import logging
+
+from festival_calendar import festival_days, festival_now
+
+logger = logging.getLogger(__name__)
+
+FESTIVAL_DAYS = festival_days()
+
+# Intent names
+NOW_PLAYING = "now_playing"
+HEADCOUNT = "headcount"
+WEATHER = "weather"
+SCHEDULE = "schedule"
+
+_NOW_PLAYING_RE = re.compile(
+    r"\b(who'?s|who is|what'?s|what is)\s+(playing|on stage)\b.*\b(now|right now|currently|at the moment)\b"
+    r"|\b(playing|on stage)\s+(right\s+)?now\b"
+    r"|\bwhat'?s\s+(playing|on stage)\s*\??$"
+    r"|\bwho'?s\s+(up\s+)?next\b|\bup next\b"
+)
+_HEADCOUNT_RE = re.compile(
+    r"\bhow many\b.*\b(people|folks|of us|friends|in (my|the|our) group|members|here)\b"
+    r"|\bhead\s?count\b"
+)
+_WEATHER_RE = re.compile(
+    r"\b(weather|temperature|forecast|raining|rainy|sunny|cloudy|windy|humid)\b"
+    # "rain" only as weather: "will it rain", "any rain tonight", not "rain poncho"
+    r"|\b(is it|will it|gonna|going to|supposed to|chance of|any)\s+rain\b"
+    r"|\brain\s+(today|tonight|tomorrow|later)\b"
+    # Hot/cold only when it is about the air, not "a hot dog" or "keep my drinks cold"
+    r"|\b(is it|it'?s|gonna be|going to be|will it be)\s+(getting\s+|gonna get\s+|too\s+|so\s+|really\s+)?(hot|cold|warm|chilly)\b"
+    r"(\s+(outside|out there|out|today|tonight|tomorrow|later|here))*\s*[?.!]*$"
+    r"|\b(hot|cold|warm|chilly)\s+(outside|out there)\b"
+    r"|\bhow (hot|cold|warm|chilly) (is it|will it be|is it gonna be|is it going to be)\b"
+)
+# Buying or pricing something ("rain poncho", "sunny-day deals") is for the model
+_SHOPPING_RE = re.compile(r"\b(buy|buying|sell|sells|selling|shop|store|price|prices|cost|costs|how much (is|are|does|do))\b")
+_SCHEDULE_WORDS_RE = re.compile(
+    r"\b(when|what time|set time|set times|schedule|lineup|line up|playing|play|plays|perform|performing|on stage|go on)\b"
+)
+_DAY_RE = re.compile(r"\b(thursday|friday|saturday|sunday|today|tonight|tomorrow)\b")
+# Weather asked about a later time is answered from the hourly forecast, not the current reading
+_WEATHER_WHEN_RE = re.compile(
+    r"\b(tonight|tomorrow(\s+(morning|afternoon|evening|night))?|this\s+(morning|afternoon|evening)"
+    r"|later|monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b"
+)
+_WEATHER_FUTURE_RE = re.compile(r"\b(will it|gonna|going to|supposed to|chance of|forecast)\b")
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+# Festival-local hours covered by each part of a day
+DAY_PARTS = {"morning": (6, 12), "afternoon": (12, 18), "evening": (18, 24), "night": (18, 24), "": (8, 24)}
+FUTURE_WEATHER_HOURS = 6
+
+
+def _fold(text: str) -> str:
+    """Lowercase and strip accents so 'Spanò' matches 'spano'"""
+    normalized = unicodedata.normalize("NFKD", text)
+    folded = "".join(ch for ch in normalized if not unicodedata.combining(ch)).lower()
+    return folded.replace("\u2019", "'")
+
+
+def _format_time(dt: datetime) -> str:
+    """Format a datetime as '7:30 PM'"""
+    return dt.strftime("%I:%M %p").lstrip("0")
+
+
+def weather_period(text: str, now: datetime) -> Optional[Tuple[str, datetime, datetime]]:
+    """(label, start, end) of the time a (folded) weather question asks about, or None for right now"""
+    match = _WEATHER_WHEN_RE.search(text)
+    if match is None:
+        if _WEATHER_FUTURE_RE.search(text):
+            return "over the next few hours", now, now + timedelta(hours=FUTURE_WEATHER_HOURS)
+        return None
+
+    when = match.group(0).split()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if when[0] == "later":
+        return "later today", now, min(now + timedelta(hours=FUTURE_WEATHER_HOURS), today + timedelta(days=1))
+    if when[0] == "tonight":
+        day, part = today, "night"
+    elif when[0] == "this":
+        day, part = today, when[1]
+    elif when[0] == "tomorrow":
+        day, part = today + timedelta(days=1), when[1] if len(when) > 1 else ""
+    else:
+        day, part = today + timedelta(days=(WEEKDAYS.index(when[0]) - now.weekday()) % 7), ""
+
+    first_hour, last_hour = DAY_PARTS[part]
+    start = max(day + timedelta(hours=first_hour), now)
+    end = day + timedelta(hours=last_hour)
+    return " ".join(when), start, end
+
+
+class IntentRouter:
+    def __init__(self, db: AsyncIOMotorDatabase, weather_service=None, group_snapshot=None, lineup_ttl: float = 60.0,
+                 lineup_cache=None):
+        self.db = db
+        self.weather_service = weather_service
+        self.group_snapshot = group_snapshot
+        self.lineup_ttl = lineup_ttl
+        # Shared LineupCache; when set, the parsed lineup is rebuilt only when its ETag changes
+        self.lineup_cache = lineup_cache
+        self._lineup_etag: Optional[str] = None
+
+        self._artists: List[Dict] = []
+        self._artist_name_re: Optional[re.Pattern] = None
+        self._artists_by_name: Dict[str, Dict] = {}
+        self._lineup_loaded_at = 0.0
+
+    async def _load_lineup(self):
+        """Load the lineup from the shared cache (or MongoDB, cached for a short TTL)"""
+        if self.lineup_cache is not None:
+            entry = await self.lineup_cache.get()
+            if entry.etag == self._lineup_etag:
+                return
+            artists, self._lineup_etag = entry.artists, entry.etag
+        else:
+            if self._artists and time.monotonic() - self._lineup_loaded_at < self.lineup_ttl:
+                return
+            artists = await self.db.artists.find(
+                {}, {"_id": 0, "id": 1, "name": 1, "stage": 1, "day": 1, "startTime": 1, "endTime": 1}
+            ).to_list(1000)
+
+        parsed = []
+        for artist in artists:
+            try:
+                # Copied so the shared cache's documents are never mutated
+                artist = {**artist, "_start": datetime.fromisoformat(artist["startTime"]),
+                          "_end": datetime.fromisoformat(artist["endTime"])}
+            except (KeyError, ValueError):
+                continue
+            parsed.append(artist)
+        parsed.sort(key=lambda a: a["_start"])
+
+        self._artists = parsed
+        self._artists_by_name = {_fold(a["name"]): a for a in parsed}
+        names = sorted(self._artists_by_name.keys(), key=len, reverse=True)
+        self._artist_name_re = re.compile(
+            r"(?<!\w)(" + "|".join(re.escape(name) for name in names) + r")(?!\w)"
+        ) if names else None
+        self._lineup_loaded_at = time.monotonic()
+
+    async def lineup(self) -> List[Dict]:
+        """The cached lineup, sorted by start time"""
+        await self._load_lineup()
+        return self._artists
+
+    def _find_artists(self, text: str) -> List[Dict]:
+        """Return lineup entries whose names appear in the (folded) message"""
+        if not self._artist_name_re:
+            return []
+        seen = []
+        for match in self._artist_name_re.findall(text):
+            artist = self._artists_by_name.get(match)
+            if artist and artist not in seen:
+                seen.append(artist)
+        return seen
+
+    def classify(self, message: str) -> Optional[str]:
+        """Classify a message into a locally answerable intent, or None for the LLM"""
+        text = _fold(message)
+
+        if _NOW_PLAYING_RE.search(text):
+            return NOW_PLAYING
+        if _HEADCOUNT_RE.search(text):
+            return HEADCOUNT
+        if _SCHEDULE_WORDS_RE.search(text) and (self._find_artists(text) or _DAY_RE.search(text)):
+            return SCHEDULE
+        if _WEATHER_RE.search(text) and not _SHOPPING_RE.search(text):
+            return WEATHER
+        return None
+
+    async def route(self, message: str) -> Optional[Dict]:
+        """Answer the message locally if possible; returns None to fall through to the LLM"""
+        try:
+            await self._load_lineup()
+            intent = self.classify(message)
+            if intent is None:
+                return None
+
+            if intent == NOW_PLAYING:
+                response = self._answer_now_playing()
+            elif intent == HEADCOUNT:
+                response = await self._answer_headcount()
+            elif intent == SCHEDULE:
+                response = self._answer_schedule(_fold(message))
+            elif intent == WEATHER:
+                response = await self._answer_weather(_fold(message))
+            else:
+                response = None
+
+            if not response:
+                return None
+            return {"intent": intent, "response": response}
+        except Exception as e:
+            logger.error(f"Intent router failed, falling through to LLM: {e}")
+            return None
+
+    def _answer_now_playing(self) -> str:
+        now = festival_now()
+        playing = [a for a in self._artists if a["_start"] <= now < a["_end"]]
+        upcoming = [a for a in self._artists if a["_start"] > now]
+
+        if playing:
+            lines = [f"{a['name']} on the {a['stage']} til {_format_time(a['_end'])}" for a in playing]
+            reply = "Right now you've got " + " and ".join(lines) + ", sugar!"
+            if upcoming:
+                nxt = upcoming[0]
+                reply += f" Up next is {nxt['name']} at {_format_time(nxt['_start'])} on the {nxt['stage']}."
+            return reply
+
+        if upcoming:
+            nxt = upcoming[0]
+            return (
+                f"Nobody's on stage this very minute, darlin'. Next up is {nxt['name']} "
+                f"on the {nxt['stage']} {nxt['day']} at {_format_time(nxt['_start'])}!"
+            )
+        return "The music's all wrapped up for this year, honey. Hope y'all had a boot-stompin' good time!"
+
+    async def _answer_headcount(self) -> str:
+        snapshot = await self.group_snapshot.get()
+        total = snapshot["total_users"]
+        ghost = snapshot["ghost_users"]
+        visible = snapshot["visible_users"]
+
+        if total == 0:
+            return "Looks like nobody's checked in with their location yet, sugar. Tell your crew to open the app!"
+        reply = f"We've got {total} {'folk' if total == 1 else 'folks'} in the group right now"
+        if ghost:
+            reply += f", {visible} sharin' their spot and {ghost} in ghost mode"
+        return reply + ", y'all!"
+
+    def _answer_schedule(self, text: str) -> Optional[str]:
+        artists = self._find_artists(text)
+        if artists:
+            lines = [
+                f"{a['name']} plays the {a['stage']} {a['day']} from "
+                f"{_format_time(a['_start'])} to {_format_time(a['_end'])}"
+                for a in artists
+            ]
+            return "\n".join(lines) + "\nDon't be late, darlin'!"
+
+        day_match = _DAY_RE.search(text)
+        if not day_match:
+            return None
+        day = day_match.group(1)
+        today = festival_now().strftime("%A")
+        if day in ("today", "tonight"):
+            day = today
+        elif day == "tomorrow":
+            day = FESTIVAL_DAYS[FESTIVAL_DAYS.index(today) + 1] if today in FESTIVAL_DAYS[:-1] else ""
+        day = day.capitalize()
+
+        day_sets = [a for a in self._artists if a.get("day") == day]
+        if not day_sets:
+            return "There's no music on the schedule that day, sugar. The festival runs Thursday through Sunday!"
+
+        lines = [f"• {_format_time(a['_start'])} - {a['name']} ({a['stage']})" for a in day_sets]
+        return f"Here's the {day} lineup, y'all:\n" + "\n".join(lines)
+
+    async def _answer_weather(self, text: str) -> Optional[str]:
+        if not self.weather_service:
+            return None
+        period = weather_period(text, festival_now())
+        if period is not None:
+            return self._answer_forecast(*period)
+
+        weather = await self.weather_service.get_current_weather()
+        reply = (
+            f"It's {weather['temperature']}°F and {weather['description'].lower()} in Wildwood "
+            f"with wind around {weather['windSpeed']} mph. {weather['daisyComment']}"
+        )
+        return reply
+
+    def _answer_forecast(self, label: str, start: datetime, end: datetime) -> Optional[str]:
+        """Summarize the forecast hours in [start, end); None (ask the LLM) when they aren't covered"""
+        forecast = self.weather_service.forecast
+        if forecast is None or start >= end:
+            return None
+        hours = []
+        when = start.replace(minute=0, second=0, microsecond=0)
+        while when < end:
+            hour = forecast.at(when)
+            if hour is not None:
+                hours.append(hour)
+            when += timedelta(hours=1)
+        temperatures = [h["temperature"] for h in hours if h.get("temperature") is not None]
+        if not temperatures:
+            return None
+
+        low, high = min(temperatures), max(temperatures)
+        temperature = f"{low}°F" if low == high else f"{low}-{high}°F"
+        reply = f"{label[0].upper() + label[1:]} it's lookin' like {temperature}"
+        rain = [h["precipitationProbability"] for h in hours if h.get("precipitationProbability") is not None]
+        if rain:
+            reply += f" with up to a {max(rain)}% chance of rain"
+        reply += " in Wildwood, sugar!"
+        if rain and max(rain) >= 50:
+            reply += " Better pack a poncho, darlin'."
+        return reply
@@ -0,0 +1,110 @@
+"""
+Personal itinerary planner. Among a user's starred sets, picks the clash-free
+plan with the most priority-weighted minutes of music, allowing walking time
+between stages (weighted interval scheduling). Plans are memoized per lineup
+version, favorites set and priorities.
+"""
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+import logging
+
+from metrics import metrics
+from schedule_index import ScheduleIndex, ScheduledSet
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WALK_MINUTES = 10
+MUST_SEE_PRIORITY = 3
+
+
+def plan_itinerary(
+    sets: List[ScheduledSet],
+    priorities: Dict[str, int],
+    walk_minutes: int = DEFAULT_WALK_MINUTES,
+) -> Tuple[List[ScheduledSet], int]:
+    """Best non-overlapping subset of sets, with walk_minutes between different stages; returns (plan, score)"""
+    ordered = sorted(sets, key=lambda s: (s.end, s.start, s.id))
+    walk = timedelta(minutes=walk_minutes)
+
+    # Per stage: ends of the sets seen so far, and the best plan ending at or before each
+    stage_ends: Dict[str, List] = {}
+    stage_best: Dict[str, List[Tuple[int, int]]] = {}  # (best score, index into ordered)
+    choice: List[Tuple[int, Optional[int]]] = []  # (score of best plan ending with this set, predecessor)
+
+    for j, current in enumerate(ordered):
+        weight = priorities.get(current.id, 1) * int((current.end - current.start).total_seconds() // 60)
+        best_prev, prev_index = 0, None
+        for stage, ends in stage_ends.items():
+            latest_end = current.start if stage == current.stage else current.start - walk
+            k = bisect_right(ends, latest_end) - 1
+            if k >= 0 and stage_best[stage][k][0] > best_prev:
+                best_prev, prev_index = stage_best[stage][k]
+        choice.append((best_prev + weight, prev_index))
+
+        # Running maximum so a lookup by end time gets the best plan finishing by then
+        ends = stage_ends.setdefault(current.stage, [])
+        best = stage_best.setdefault(current.stage, [])
+        ends.append(current.end)
+        best.append(max(best[-1], (best_prev + weight, j)) if best else (best_prev + weight, j))
+
+    if not choice:
+        return [], 0
+    last = max(range(len(choice)), key=lambda i: choice[i][0])
+    score = choice[last][0]
+    plan = []
+    while last is not None:
+        plan.append(ordered[last])
+        last = choice[last][1]
+    return plan[::-1], score
+
+
+class ItineraryPlanner:
+    def __init__(self, cache_size: int = 1024, walk_minutes: int = DEFAULT_WALK_MINUTES):
+        self.cache_size = cache_size
+        self.walk_minutes = walk_minutes
+        self._plans: "OrderedDict[Tuple[str, FrozenSet[str], FrozenSet[Tuple[str, int]], int], Dict]" = OrderedDict()
+
+    def plan(
+        self,
+        index: ScheduleIndex,
+        artist_ids: Iterable[str],
+        must_see: Iterable[str] = (),
+        walk_minutes: Optional[int] = None,
+    ) -> Dict:
+        """Itinerary for a set of starred artists, memoized per lineup version and favorites"""
+        walk_minutes = self.walk_minutes if walk_minutes is None else walk_minutes
+        favorites = frozenset(artist_id for artist_id in artist_ids if artist_id in index.by_id)
+        priorities = {artist_id: MUST_SEE_PRIORITY for artist_id in must_see if artist_id in favorites}
+        key = (index.version, favorites, frozenset(priorities.items()), walk_minutes)
+
+        cached = self._plans.get(key)
+        if cached is not None:
+            self._plans.move_to_end(key)
+            metrics.incr("itinerary.cache.hit")
+            return cached
+        metrics.incr("itinerary.cache.miss")
+
+        starred = index.favorites_timeline(favorites)
+        plan, score = plan_itinerary(starred, priorities, walk_minutes)
+        chosen = {s.id for s in plan}
+
+        stops = []
+        for previous, current in zip([None] + plan, plan):
+            stop = current.to_dict()
+            stop["mustSee"] = current.id in priorities
+            stop["walkFromPrevious"] = walk_minutes if previous and previous.stage != current.stage else 0
+            stops.append(stop)
+
+        result = {
+            "plan": stops,
+            "skipped": [s.to_dict() for s in starred if s.id not in chosen],
+            "total_minutes": sum(int((s.end - s.start).total_seconds() // 60) for s in plan),
+            "score": score,
+            "walk_minutes": walk_minutes
+        }
+        self._plans[key] = result
+        if len(self._plans) > self.cache_size:
+            self._plans.popitem(last=False)
+        return result
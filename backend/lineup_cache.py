@@ -0,0 +1,125 @@
+"""
+Pre-encoded /api/artists response. The lineup is read from MongoDB once,
+serialized (and gzipped) once, and served as bytes with an ETag until a
+reseed invalidates it or the TTL lapses; a reload that finds the same content
+keeps the existing encoding and ETag. Stars live in user_favorites and never
+touch this encoding.
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import time
+from typing import Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+import logging
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an ETag against an If-None-Match header"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an Accept-Encoding header allows gzip, honoring q-values ("gzip;q=0" refuses it)"""
+    qualities = {}
+    for part in (accept_encoding or "").split(","):
+        coding, *params = [piece.strip() for piece in part.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    quality = qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0)))
+    return quality > 0
+
+
+class EncodedLineup:
+    __slots__ = ("artists", "ids", "body", "gzipped", "etag")
+
+    def __init__(self, artists: List[Dict], body: bytes, gzipped: Optional[bytes], etag: str):
+        self.artists = artists
+        self.ids = frozenset(artist["id"] for artist in artists)
+        self.body = body
+        self.gzipped = gzipped
+        self.etag = etag
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        return etag_matches(if_none_match, self.etag)
+
+
+class LineupCache:
+    def __init__(self, db: AsyncIOMotorDatabase, ttl: float = 5.0, gzip_min_size: int = 1024):
+        self.db = db
+        # Bounds staleness from writes made by other workers
+        self.ttl = ttl
+        self.gzip_min_size = gzip_min_size
+        self.version = 0
+
+        self._entry: Optional[EncodedLineup] = None
+        self._entry_version = -1
+        self._expires_at = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+
+    def invalidate(self):
+        """Drop the cached encoding; called after the lineup is reseeded"""
+        self.version += 1
+
+    async def get(self) -> EncodedLineup:
+        """The current encoded lineup, reloading it with a single in-flight read when stale"""
+        if self._entry is not None and self._entry_version == self.version and time.monotonic() < self._expires_at:
+            metrics.incr("lineup.cache.hit")
+            return self._entry
+        metrics.incr("lineup.cache.miss")
+
+        if self._inflight is None:
+            # Detached so one caller being cancelled can't cancel the read for the rest
+            self._inflight = asyncio.create_task(self._reload(self.version))
+            self._inflight.add_done_callback(self._reload_done)
+        return await asyncio.shield(self._inflight)
+
+    async def artists(self) -> List[Dict]:
+        """The lineup documents behind the current encoding; callers must not mutate them"""
+        return (await self.get()).artists
+
+    async def _reload(self, version: int) -> EncodedLineup:
+        entry = await self._load()
+        self._entry, self._entry_version = entry, version
+        self._expires_at = time.monotonic() + self.ttl
+        return entry
+
+    def _reload_done(self, task: asyncio.Task):
+        self._inflight = None
+        # Every waiter may have been cancelled; don't let the loop warn about an unretrieved exception
+        if not task.cancelled():
+            task.exception()
+
+    async def _load(self) -> EncodedLineup:
+        artists = await self.db.artists.find().sort("_id", 1).to_list(1000)
+        # Convert ObjectId to string for JSON serialization
+        for artist in artists:
+            artist["_id"] = str(artist["_id"])
+
+        body = json.dumps({"artists": artists}, ensure_ascii=False, separators=(",", ":")).encode()
+        etag = f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+        if self._entry is not None and self._entry.etag == etag:
+            return self._entry
+
+        gzipped = gzip.compress(body, 6) if len(body) >= self.gzip_min_size else None
+        logger.info(f"Encoded lineup: {len(artists)} artists, {len(body)} bytes ({len(gzipped or body)} on the wire)")
+        return EncodedLineup(artists, body, gzipped, etag)
@@ -0,0 +1,169 @@
+"""
+Lineup seeding from data/lineup.json. The file is schema-checked and content
+hashed; startup compares the hash with the version stored in the meta
+collection and, only when it differs, applies a bulk upsert/delete diff under
+a lock so exactly one worker seeds. Existing stars are never touched.
+"""
+import asyncio
+import hashlib
+import json
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import DeleteMany, UpdateOne
+from pymongo.errors import DuplicateKeyError
+import logging
+
+logger = logging.getLogger(__name__)
+
+LINEUP_PATH = Path(__file__).parent / "data" / "lineup.json"
+LINEUP_META_ID = "lineup"
+LINEUP_LOCK_ID = "lineup_seed"
+
+# Fields owned by the data file; everything else on an artist document (stars) belongs to users
+SCHEDULE_FIELDS = ("name", "stage", "startTime", "endTime", "day")
+DAYS = {"Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"}
+
+
+class LineupValidationError(ValueError):
+    pass
+
+
+def validate_lineup(artists: List[Dict]):
+    """Raise LineupValidationError if any artist entry is malformed"""
+    if not isinstance(artists, list) or not artists:
+        raise LineupValidationError("Lineup must be a non-empty list of artists")
+
+    seen = set()
+    for position, artist in enumerate(artists):
+        where = f"artist #{position + 1}"
+        if not isinstance(artist, dict):
+            raise LineupValidationError(f"{where} is not an object")
+        for field in ("id",) + SCHEDULE_FIELDS:
+            if not isinstance(artist.get(field), str) or not artist[field].strip():
+                raise LineupValidationError(f"{where} is missing a string '{field}'")
+        if "isStarred" in artist and not isinstance(artist["isStarred"], bool):
+            raise LineupValidationError(f"{where} has a non-boolean 'isStarred'")
+        if artist["id"] in seen:
+            raise LineupValidationError(f"Duplicate artist id {artist['id']!r}")
+        seen.add(artist["id"])
+
+        try:
+            start = datetime.fromisoformat(artist["startTime"])
+            end = datetime.fromisoformat(artist["endTime"])
+        except ValueError:
+            raise LineupValidationError(f"{where} ({artist['name']}) has an invalid set time")
+        if end <= start:
+            raise LineupValidationError(f"{where} ({artist['name']}) ends before it starts")
+        if artist["day"] not in DAYS or artist["day"] != start.strftime("%A"):
+            raise LineupValidationError(f"{where} ({artist['name']}) is on {start.strftime('%A')}, not {artist['day']}")
+
+
+def load_lineup_file(path: Path = LINEUP_PATH) -> Tuple[List[Dict], str]:
+    """Read and validate the lineup file; returns (artists, content hash)"""
+    with open(path, encoding="utf-8") as f:
+        artists = json.load(f).get("artists")
+    validate_lineup(artists)
+    # Hash a canonical encoding so whitespace and key order don't count as changes
+    canonical = json.dumps(sorted(artists, key=lambda a: a["id"]), sort_keys=True, separators=(",", ":"))
+    return artists, hashlib.sha256(canonical.encode()).hexdigest()
+
+
+async def _lineup_version(db: AsyncIOMotorDatabase):
+    meta = await db.meta.find_one({"_id": LINEUP_META_ID}, {"version": 1})
+    return meta.get("version") if meta else None
+
+
+async def _acquire_lock(db: AsyncIOMotorDatabase, owner: str, ttl: float) -> bool:
+    now = datetime.utcnow()
+    # Clear a lock left behind by a worker that died mid-seed
+    await db.locks.delete_one({"_id": LINEUP_LOCK_ID, "expires_at": {"$lt": now}})
+    try:
+        await db.locks.insert_one({"_id": LINEUP_LOCK_ID, "owner": owner, "expires_at": now + timedelta(seconds=ttl)})
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+async def _remove_duplicate_ids(db: AsyncIOMotorDatabase) -> int:
+    """Delete all but one document per artist id; the old wipe-and-reload seeding could race into duplicates"""
+    groups = await db.artists.aggregate([
+        {"$group": {"_id": "$id", "docs": {"$push": {"_id": "$_id", "starred": "$isStarred"}}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}}
+    ]).to_list(None)
+
+    doomed = []
+    for group in groups:
+        # Keep a starred copy if there is one, else the oldest
+        docs = sorted(group["docs"], key=lambda doc: (not doc.get("starred"), doc["_id"]))
+        doomed.extend(doc["_id"] for doc in docs[1:])
+    if doomed:
+        await db.artists.delete_many({"_id": {"$in": doomed}})
+        logger.warning(f"Removed {len(doomed)} duplicate artist documents across {len(groups)} ids")
+    return len(doomed)
+
+
+async def seed_lineup(
+    db: AsyncIOMotorDatabase,
+    path: Path = LINEUP_PATH,
+    lock_ttl: float = 60,
+    wait_timeout: float = 30,
+    poll_interval: float = 0.5,
+) -> Dict:
+    """Bring the artists collection in line with the lineup file; a no-op when already current"""
+    artists, version = load_lineup_file(path)
+    if await _lineup_version(db) == version:
+        return {"status": "current", "version": version}
+
+    owner = uuid.uuid4().hex
+    deadline = asyncio.get_running_loop().time() + wait_timeout
+    while not await _acquire_lock(db, owner, lock_ttl):
+        # Another worker is seeding; wait for it so we don't serve a half-applied lineup
+        if await _lineup_version(db) == version:
+            return {"status": "current", "version": version}
+        if asyncio.get_running_loop().time() > deadline:
+            logger.warning("Timed out waiting for another worker to seed the lineup")
+            return {"status": "timeout", "version": version}
+        await asyncio.sleep(poll_interval)
+
+    try:
+        # Someone may have finished seeding between our check and taking the lock
+        if await _lineup_version(db) == version:
+            return {"status": "current", "version": version}
+
+        # The unique index can't be built over duplicates, and the diff below would hide them
+        await _remove_duplicate_ids(db)
+        await db.artists.create_index("id", unique=True)
+        stored = {
+            doc["id"]: doc
+            for doc in await db.artists.find({}, {"_id": 0, "id": 1, **{f: 1 for f in SCHEDULE_FIELDS}}).to_list(None)
+        }
+
+        operations = []
+        for artist in artists:
+            schedule = {field: artist[field] for field in SCHEDULE_FIELDS}
+            current = stored.get(artist["id"])
+            if current is not None and all(current.get(f) == schedule[f] for f in SCHEDULE_FIELDS):
+                continue
+            operations.append(UpdateOne(
+                {"id": artist["id"]},
+                {"$set": schedule, "$setOnInsert": {"isStarred": artist.get("isStarred", False)}},
+                upsert=True
+            ))
+        removed = set(stored) - {artist["id"] for artist in artists}
+        if removed:
+            operations.append(DeleteMany({"id": {"$in": sorted(removed)}}))
+
+        if operations:
+            await db.artists.bulk_write(operations, ordered=False)
+        await db.meta.update_one(
+            {"_id": LINEUP_META_ID},
+            {"$set": {"version": version, "artist_count": len(artists), "applied_at": datetime.utcnow()}},
+            upsert=True
+        )
+        logger.info(f"Seeded lineup {version[:12]}: {len(operations) - bool(removed)} upserted, {len(removed)} removed")
+        return {"status": "seeded", "version": version, "changed": len(operations) - bool(removed), "removed": len(removed)}
+    finally:
+        await db.locks.delete_one({"_id": LINEUP_LOCK_ID, "owner": owner})
@@ -0,0 +1,95 @@
+"""
+As-you-type lineup search. Artist names and stages are accent-folded and
+split into tokens held in one sorted array; each query term is a bisect range
+over that array, and an artist matches when every term prefixes one of its
+tokens. The index is rebuilt only when the lineup version changes.
+"""
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from lineup_cache import LineupCache
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Match kinds, best first
+NAME_START, NAME_WORD, STAGE_WORD = 0, 1, 2
+
+
+def fold_terms(text: str) -> List[str]:
+    """Lowercase, strip accents ('Spanò' -> 'spano') and split into words"""
+    normalized = unicodedata.normalize("NFKD", text or "")
+    folded = "".join(ch for ch in normalized if not unicodedata.combining(ch)).lower()
+    return _TOKEN_RE.findall(folded)
+
+
+class LineupSearchIndex:
+    def __init__(self, artists: List[Dict], version: str = ""):
+        self.version = version
+        self.artists = sorted(artists, key=lambda a: (a.get("startTime", ""), a["id"]))
+
+        entries: List[Tuple[str, int, int]] = []
+        for position, artist in enumerate(self.artists):
+            for i, term in enumerate(fold_terms(artist["name"])):
+                entries.append((term, position, NAME_START if i == 0 else NAME_WORD))
+            # Punctuated words also match run together, so "botb" finds "B.O.T.B"
+            for word in artist["name"].split():
+                parts = fold_terms(word)
+                if len(parts) > 1:
+                    entries.append(("".join(parts), position, NAME_WORD))
+            for term in fold_terms(artist.get("stage", "")):
+                entries.append((term, position, STAGE_WORD))
+        entries.sort()
+        self._terms = [entry[0] for entry in entries]
+        self._entries = entries
+
+    def _prefix_matches(self, prefix: str) -> Dict[int, int]:
+        """artist position -> best match kind for tokens starting with prefix"""
+        matches: Dict[int, int] = {}
+        i = bisect_left(self._terms, prefix)
+        while i < len(self._entries) and self._terms[i].startswith(prefix):
+            _, position, kind = self._entries[i]
+            if kind < matches.get(position, STAGE_WORD + 1):
+                matches[position] = kind
+            i += 1
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """Artists whose name or stage words start with every query term, best matches first"""
+        terms = fold_terms(query)
+        if not terms:
+            return []
+
+        scores: Optional[Dict[int, int]] = None
+        # Longest term first: it usually has the narrowest range
+        for term in sorted(set(terms), key=len, reverse=True):
+            matches = self._prefix_matches(term)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {position: scores[position] + kind for position, kind in matches.items() if position in scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores, key=lambda position: (scores[position], position))[:limit]
+        return [
+            {field: self.artists[position].get(field) for field in ("id", "name", "stage", "day", "startTime", "endTime")}
+            for position in ranked
+        ]
+
+
+class LineupSearch:
+    def __init__(self, lineup_cache: LineupCache):
+        self.lineup_cache = lineup_cache
+        self._index: Optional[LineupSearchIndex] = None
+
+    async def search(self, query: str, limit: int = 10) -> List[Dict]:
+        lineup = await self.lineup_cache.get()
+        if self._index is None or self._index.version != lineup.etag:
+            self._index = LineupSearchIndex(lineup.artists, lineup.etag)
+            logger.info(f"Built lineup search index over {len(self._index.artists)} artists")
+        return self._index.search(query, limit)
@@ -0,0 +1,147 @@
+"""
+Hedged chat completions. If a call runs past the recent p95 latency for its
+kind, a duplicate is fired (optionally at a cheaper model); whichever finishes
+first wins and the other is cancelled. A hedge is extra upstream load, so it
+only fires when it can take a spare admission slot of its own.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+import logging
+
+from metrics import metrics, percentile
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def quantile(self, pct: float) -> Optional[float]:
+        """Percentile of recent latencies, or None until there are enough samples"""
+        if len(self._samples) < self.min_samples:
+            return None
+        return percentile(sorted(self._samples), pct)
+
+
+class HedgedCompletions:
+    def __init__(
+        self,
+        client,
+        hedge_model: Optional[str] = None,
+        hedge_percentile: float = 95,
+        default_delay: float = 4.0,
+        min_delay: float = 0.5,
+        enabled: bool = True,
+        ledger=None,
+        admission=None,
+    ):
+        self.client = client
+        self.ledger = ledger
+        self.admission = admission
+        self.hedge_model = hedge_model
+        self.hedge_percentile = hedge_percentile
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.enabled = enabled
+        self._trackers: Dict[str, LatencyTracker] = {}
+
+    def hedge_delay(self, kind: str) -> float:
+        """How long to wait on the primary call before firing a hedge"""
+        tracker = self._trackers.setdefault(kind, LatencyTracker())
+        threshold = tracker.quantile(self.hedge_percentile)
+        return max(self.min_delay, threshold if threshold is not None else self.default_delay)
+
+    async def create(self, kind: str, **kwargs):
+        """chat.completions.create with hedging; kind groups calls with similar latency"""
+        started = time.monotonic()
+        primary = asyncio.create_task(self.client.chat.completions.create(**kwargs))
+        if not self.enabled:
+            return await self._timed(kind, primary, started, kwargs.get("model"))
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay(kind))
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done:
+            return await self._timed(kind, primary, started, kwargs.get("model"))
+        if self.admission is not None and not self.admission.try_acquire():
+            # Under load a duplicate would take capacity from queued users; wait on the primary
+            metrics.incr(f"llm.hedge.skipped.{kind}")
+            return await self._timed(kind, primary, started, kwargs.get("model"))
+
+        metrics.incr(f"llm.hedge.fired.{kind}")
+        hedge_kwargs = dict(kwargs)
+        if self.hedge_model:
+            hedge_kwargs["model"] = self.hedge_model
+        hedge_started = time.monotonic()
+        hedge = asyncio.create_task(self.client.chat.completions.create(**hedge_kwargs))
+        if self.admission is not None:
+            # Held until the hedge call itself ends, whether it wins, loses or is cancelled
+            hedge.add_done_callback(lambda _: self.admission.release())
+        # task -> (started, model) for the ledger; removed once the attempt is recorded
+        unrecorded = {primary: (started, kwargs.get("model")), hedge: (hedge_started, hedge_kwargs.get("model"))}
+        pending = {primary, hedge}
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task_started, model = unrecorded.pop(task)
+                    if task.exception() is None:
+                        metrics.incr(f"llm.hedge.won.{'primary' if task is primary else 'hedge'}")
+                        # When the hedge wins this is a lower bound on the primary's latency
+                        self._trackers[kind].record(time.monotonic() - started)
+                        self._record(kind, started, task.result())
+                        return task.result()
+                    logger.warning(f"Hedged {kind} call failed: {task.exception()}")
+                    self._record(kind, task_started, model=model, error=True)
+            # Both failed; surface the primary's error
+            return primary.result()
+        finally:
+            # The losing attempt still cost tokens (if it finished) and upstream time
+            for task, (task_started, model) in unrecorded.items():
+                if not task.done() or task.cancelled():
+                    task.cancel()
+                    self._record(kind, task_started, model=model, lost=True)
+                elif task.exception() is None:
+                    self._record(kind, task_started, task.result(), lost=True)
+                else:
+                    self._record(kind, task_started, model=model, error=True)
+
+    async def _timed(self, kind: str, task: asyncio.Task, started: float, model: Optional[str]):
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        except Exception:
+            self._record(kind, started, model=model, error=True)
+            raise
+        self._trackers.setdefault(kind, LatencyTracker()).record(time.monotonic() - started)
+        self._record(kind, started, result)
+        return result
+
+    def _record(
+        self, kind: str, started: float, result=None, model: Optional[str] = None, error: bool = False, lost: bool = False
+    ):
+        """Add the call to the ledger with its token usage (unknown for a cancelled attempt)"""
+        if self.ledger is None:
+            return
+        usage = getattr(result, "usage", None)
+        self.ledger.record(
+            f"llm.{kind}",
+            (time.monotonic() - started) * 1000,
+            model=getattr(result, "model", None) or model,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            error=error,
+            lost=lost
+        )
@@ -0,0 +1,181 @@
+"""
+Ledger of LLM and tool calls made while answering chat messages. Each call is
+recorded as a compact document (batched into llm_calls) and folded into
+per-minute rollups (llm_call_rollups). Rollups also carry a latency
+histogram over fixed buckets, so p50/p95/p99 for any window come from the
+rollups alone and never from the raw calls.
+"""
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_FIELDS = ("count", "errors", "lost", "latency_ms_sum", "prompt_tokens", "completion_tokens", "cache_hits", "cache_misses")
+# Upper bounds (ms) of the latency histogram buckets, about 1.6x apart; the last one also takes anything slower
+LATENCY_BUCKETS_MS = (
+    10, 15, 25, 40, 60, 100, 150, 250, 400, 600, 1000, 1500, 2500, 4000, 6000,
+    10000, 15000, 25000, 40000, 60000, 120000, 600000
+)
+MAX_REPORT_MINUTES = 7 * 24 * 60
+
+
+def latency_bucket(latency_ms: float) -> str:
+    """Histogram bucket key for a latency: the upper bound of its bucket"""
+    return str(next((bound for bound in LATENCY_BUCKETS_MS if latency_ms <= bound), LATENCY_BUCKETS_MS[-1]))
+
+
+def bucket_percentiles(buckets: Dict[str, int]) -> Dict[str, float]:
+    """count, p50/p95/p99 and max of a {bucket key: count} histogram, as bucket upper bounds"""
+    ordered = sorted((int(key), count) for key, count in buckets.items() if count)
+    total = sum(count for _, count in ordered)
+    summary = {"count": total}
+    for name, pct in (("p50", 50), ("p95", 95), ("p99", 99)):
+        # Nearest rank, as metrics.percentile does over raw samples
+        rank, seen, value = max(1, round(pct / 100 * total)), 0, 0
+        for bound, count in ordered:
+            seen += count
+            if seen >= rank:
+                value = bound
+                break
+        summary[name] = float(value)
+    summary["max"] = float(ordered[-1][0]) if ordered else 0.0
+    return summary
+
+
+class CallLedger:
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        flush_interval: float = 2.0,
+        max_pending: int = 10000,
+        retention_days: float = 7,
+    ):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retention_days = retention_days
+
+        self._calls: List[Dict] = []
+        # (minute, call_type) -> rollup counters
+        self._rollups: Dict[Tuple[datetime, str], Dict[str, float]] = defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+        self._task: Optional[asyncio.Task] = None
+
+    async def ensure_indexes(self):
+        await self.db.llm_calls.create_index(
+            "ts", name="ledger_ttl", expireAfterSeconds=int(self.retention_days * 86400)
+        )
+        await self.db.llm_call_rollups.create_index(
+            [("minute", 1), ("type", 1)], name="minute_type", unique=True
+        )
+
+    def record(
+        self,
+        call_type: str,
+        latency_ms: float,
+        model: Optional[str] = None,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        tool: Optional[str] = None,
+        cache_hit: Optional[bool] = None,
+        error: bool = False,
+        lost: bool = False,
+    ):
+        """Record one LLM or tool call; lost marks a hedged attempt whose result was discarded"""
+        now = datetime.utcnow()
+        call = {"ts": now, "type": call_type, "ms": round(latency_ms, 1)}
+        # Only store the fields that apply, to keep ledger documents small
+        for key, value in (("model", model), ("pt", prompt_tokens), ("ct", completion_tokens),
+                           ("tool", tool), ("hit", cache_hit)):
+            if value is not None:
+                call[key] = value
+        if error:
+            call["err"] = True
+        if lost:
+            call["lost"] = True
+
+        if len(self._calls) < self.max_pending:
+            self._calls.append(call)
+
+        rollup = self._rollups[(now.replace(second=0, microsecond=0), call_type)]
+        rollup["count"] += 1
+        rollup["errors"] += 1 if error else 0
+        rollup["lost"] += 1 if lost else 0
+        rollup["latency_ms_sum"] += latency_ms
+        rollup["prompt_tokens"] += prompt_tokens or 0
+        rollup["completion_tokens"] += completion_tokens or 0
+        if cache_hit is not None:
+            rollup["cache_hits" if cache_hit else "cache_misses"] += 1
+        # Percentiles cover answered calls only: failures and discarded hedges would skew them
+        if not (error or lost):
+            bucket = f"latency_buckets.{latency_bucket(latency_ms)}"
+            rollup[bucket] = rollup.get(bucket, 0) + 1
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self):
+        """Write batched calls and minute rollups"""
+        calls, self._calls = self._calls, []
+        rollups, self._rollups = self._rollups, defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+
+        try:
+            if calls:
+                await self.db.llm_calls.insert_many(calls, ordered=False)
+            if rollups:
+                await self.db.llm_call_rollups.bulk_write([
+                    UpdateOne(
+                        {"minute": minute, "type": call_type},
+                        {"$inc": counters},
+                        upsert=True
+                    )
+                    for (minute, call_type), counters in rollups.items()
+                ], ordered=False)
+        except Exception as e:
+            # The ledger is diagnostic; losing a batch is preferable to growing without bound
+            logger.error(f"Error flushing LLM call ledger ({len(calls)} calls): {e}")
+
+    async def report(self, minutes: int = 60) -> Dict:
+        """Per call type totals and latency percentiles over the last N minutes, from the rollups"""
+        minutes = max(1, min(minutes, MAX_REPORT_MINUTES))
+        await self.flush()
+        since = datetime.utcnow().replace(second=0, microsecond=0) - timedelta(minutes=minutes)
+        rows = await self.db.llm_call_rollups.find(
+            {"minute": {"$gte": since}}, {"_id": 0}
+        ).to_list(None)
+
+        totals: Dict[str, Dict[str, float]] = defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+        buckets: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for row in rows:
+            for field in ROLLUP_FIELDS:
+                totals[row["type"]][field] += row.get(field, 0)
+            for bucket, count in row.get("latency_buckets", {}).items():
+                buckets[row["type"]][bucket] += count
+
+        report = {}
+        for call_type, summary in totals.items():
+            count, latency_sum = summary["count"], summary.pop("latency_ms_sum")
+            summary["avg_latency_ms"] = round(latency_sum / count, 1) if count else 0.0
+            summary["latency_ms"] = bucket_percentiles(buckets[call_type])
+            report[call_type] = summary
+        return {"window_minutes": minutes, "call_types": report}
@@ -9,6 +9,7 @@ import json
 from typing import Dict, Optional, List, Any
 import logging
 from motor.motor_asyncio import AsyncIOMotorClient
+from group_snapshot import GroupSnapshotCache
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +45,11 @@ class LocationService:
     def __init__(self, db_client: AsyncIOMotorClient):
         self.db_client = db_client
         self.db = db_client[os.environ['DB_NAME']]
+
+        # Shared group snapshot, invalidated by every location write below
+        self.group_snapshot = GroupSnapshotCache(
+            self.db, ttl=float(os.environ.get('GROUP_SNAPSHOT_TTL', '5'))
+        )
         
         # Initialize Firebase if not already done
         if not firebase_admin._apps:
@@ -113,6 +119,7 @@ class LocationService:
                 },
                 upsert=True
             )
+            self.group_snapshot.invalidate()
 
             return {"status": "success", "message": "Location updated"}
 
@@ -185,6 +192,7 @@ class LocationService:
                     }
                 }
             )
+            self.group_snapshot.invalidate()
 
             return {"status": "success", "ghost_mode": ghost_mode}
 
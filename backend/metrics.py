@@ -0,0 +1,70 @@
+"""
+Lightweight in-process metrics (counters and latency histograms) for the
+Barefoot Buddy API, exposed through /api/metrics
+"""
+from collections import defaultdict, deque
+from typing import Deque, Dict, List
+import threading
+
+HISTOGRAM_WINDOW = 2048
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class Metrics:
+    def __init__(self, window: int = HISTOGRAM_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._histograms: Dict[str, Deque[float]] = {}
+        self._histogram_counts: Dict[str, int] = defaultdict(int)
+
+    def incr(self, name: str, value: int = 1):
+        """Increment a counter"""
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, value: float):
+        """Record a sample (e.g. milliseconds) in a sliding-window histogram"""
+        with self._lock:
+            samples = self._histograms.get(name)
+            if samples is None:
+                samples = self._histograms[name] = deque(maxlen=self.window)
+            samples.append(value)
+            self._histogram_counts[name] += 1
+
+    def quantile(self, name: str, pct: float) -> float:
+        """Percentile of the recent samples of a histogram"""
+        with self._lock:
+            samples = sorted(self._histograms.get(name, ()))
+        return percentile(samples, pct)
+
+    def snapshot(self) -> Dict:
+        """Return all counters and histogram summaries"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {name: sorted(samples) for name, samples in self._histograms.items()}
+            counts = dict(self._histogram_counts)
+
+        return {
+            "counters": counters,
+            "histograms": {
+                name: {
+                    "count": counts.get(name, 0),
+                    "p50": round(percentile(samples, 50), 2),
+                    "p95": round(percentile(samples, 95), 2),
+                    "p99": round(percentile(samples, 99), 2),
+                    "max": round(samples[-1], 2) if samples else 0.0
+                }
+                for name, samples in histograms.items()
+            }
+        }
+
+
+metrics = Metrics()
@@ -0,0 +1,220 @@
+"""
+Offline stand-in for the OpenAI chat completions API and the LangSearch web
+search API, for load-testing the Daisy DukeBot chat pipeline without keys or
+network access.
+
+Run it and point the backend at it:
+
+    python mock_llm_server.py --port 8010 --script mock_llm_script.json
+    OPENAI_BASE_URL=http://localhost:8010/v1 OPENAI_API_KEY=mock \
+    LANGSEARCH_BASE_URL=http://localhost:8010 LANGSEARCH_API_KEY=mock uvicorn server:app
+
+The optional script file is JSON:
+
+    {
+      "latency": {"distribution": "lognormal", "median_ms": 800, "sigma": 0.5},
+      "search_latency": {"distribution": "uniform", "min_ms": 200, "max_ms": 600},
+      "error_rate": 0.02,
+      "error_status": 429,
+      "rules": [
+        {"match": "where('?s| is) (everyone|my group)", "tool_call": {"name": "get_group_locations", "arguments": {}}},
+        {"match": "(eat|food|tacos|bar)", "tool_call": {"name": "search_web", "arguments": {"query": "$message"}}},
+        {"match": "hello|hi ", "reply": "Well hey there, sugar!"}
+      ]
+    }
+
+Rules are matched in order against the last user message (case-insensitive).
+After a tool result comes back the stand-in replies with a canned summary.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+DEFAULT_SCRIPT = {
+    "latency": {"distribution": "lognormal", "median_ms": 800, "sigma": 0.5},
+    "search_latency": {"distribution": "uniform", "min_ms": 200, "max_ms": 600},
+    "error_rate": 0.0,
+    "error_status": 429,
+    "rules": [
+        {"match": r"where('?s| is| are)\b.*\b(everyone|everybody|my group|my friends|the group)",
+         "tool_call": {"name": "get_group_locations", "arguments": {}}},
+        {"match": r"\b(eat|food|restaurant|tacos|pizza|bar|drinks|parking|pharmacy|store)\b",
+         "tool_call": {"name": "search_web", "arguments": {"query": "$message"}}}
+    ],
+    "default_reply": "Well bless your heart, sugar! That's a fine question. Y'all have a boot-stompin' good time at Barefoot!"
+}
+
+
+def _sample_latency(spec: Dict) -> float:
+    """Sample a latency in seconds from a distribution spec"""
+    distribution = spec.get("distribution", "fixed")
+    if distribution == "lognormal":
+        median = spec.get("median_ms", 800)
+        return random.lognormvariate(0, spec.get("sigma", 0.5)) * median / 1000.0
+    if distribution == "uniform":
+        return random.uniform(spec.get("min_ms", 0), spec.get("max_ms", 1000)) / 1000.0
+    if distribution == "exponential":
+        return random.expovariate(1000.0 / max(1, spec.get("mean_ms", 500)))
+    return spec.get("ms", 0) / 1000.0
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text or "") // 4)
+
+
+class MockLLM:
+    def __init__(self, script: Optional[Dict] = None):
+        self.script = dict(DEFAULT_SCRIPT)
+        self.script.update(script or {})
+        self.rules = [
+            (re.compile(rule["match"], re.IGNORECASE), rule) for rule in self.script.get("rules", [])
+        ]
+        self.stats = {"completions": 0, "tool_calls": 0, "errors": 0, "searches": 0}
+
+    def _error(self) -> Optional[JSONResponse]:
+        if random.random() < self.script.get("error_rate", 0.0):
+            self.stats["errors"] += 1
+            status = self.script.get("error_status", 429)
+            return JSONResponse(
+                status_code=status,
+                content={"error": {"message": "Mock upstream error", "type": "mock_error", "code": status}},
+                headers={"Retry-After": "1"} if status == 429 else None
+            )
+        return None
+
+    def _respond(self, messages: List[Dict], tools_offered: bool) -> Dict:
+        """Build the assistant message for a conversation"""
+        last = messages[-1] if messages else {}
+        if last.get("role") == "tool":
+            content = last.get("content") or ""
+            return {
+                "role": "assistant",
+                "content": f"Here's what I found, darlin': {content[:200]}"
+            }
+
+        user_text = next(
+            (m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), ""
+        )
+        for pattern, rule in self.rules:
+            if not pattern.search(user_text):
+                continue
+            if "tool_call" in rule and tools_offered:
+                arguments = {
+                    key: (user_text if value == "$message" else value)
+                    for key, value in rule["tool_call"].get("arguments", {}).items()
+                }
+                self.stats["tool_calls"] += 1
+                return {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [{
+                        "id": f"call_{uuid.uuid4().hex[:24]}",
+                        "type": "function",
+                        "function": {"name": rule["tool_call"]["name"], "arguments": json.dumps(arguments)}
+                    }]
+                }
+            if "reply" in rule:
+                return {"role": "assistant", "content": rule["reply"]}
+
+        return {"role": "assistant", "content": self.script["default_reply"]}
+
+    async def chat_completion(self, body: Dict):
+        await asyncio.sleep(_sample_latency(self.script.get("latency", {})))
+        error = self._error()
+        if error is not None:
+            return error
+
+        self.stats["completions"] += 1
+        messages = body.get("messages", [])
+        message = self._respond(messages, bool(body.get("tools")))
+        prompt_tokens = sum(_count_tokens(m.get("content") or "") for m in messages)
+        completion_tokens = _count_tokens(message.get("content") or json.dumps(message.get("tool_calls")))
+
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if message.get("tool_calls") else "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    async def web_search(self, body: Dict):
+        await asyncio.sleep(_sample_latency(self.script.get("search_latency", {})))
+        error = self._error()
+        if error is not None:
+            return error
+
+        self.stats["searches"] += 1
+        query = body.get("query", "")
+        pages = [
+            {
+                "name": f"Mock result {i + 1} for {query}",
+                "url": f"https://example.com/{i + 1}",
+                "snippet": f"A local spot matching '{query}', open late during the festival."
+            }
+            for i in range(min(body.get("count", 5), 5))
+        ]
+        return {"code": 200, "data": {"webPages": {"value": pages}}}
+
+
+def create_app(script: Optional[Dict] = None) -> FastAPI:
+    mock = MockLLM(script)
+    app = FastAPI(title="Mock LLM")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        return await mock.chat_completion(await request.json())
+
+    @app.post("/v1/web-search")
+    async def web_search(request: Request):
+        return await mock.web_search(await request.json())
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "gpt-4o", "object": "model"}]}
+
+    @app.get("/stats")
+    async def stats():
+        return mock.stats
+
+    return app
+
+
+def _load_script(path: Optional[str]) -> Optional[Dict]:
+    if not path:
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+app = create_app(_load_script(os.environ.get("MOCK_LLM_SCRIPT")))
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Offline OpenAI/LangSearch stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--script", help="JSON file with latency, error and reply rules")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(_load_script(args.script)), host=args.host, port=args.port)
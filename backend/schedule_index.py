@@ -0,0 +1,130 @@
+"""
+Server-side schedule index. Set times are parsed once per lineup version into
+start-sorted arrays, across the lineup and per stage, so "now playing",
+"up next" and overlap questions are answered by binary search instead of
+shipping the whole lineup to the client.
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from lineup_cache import LineupCache
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledSet:
+    __slots__ = ("id", "name", "stage", "day", "start", "end")
+
+    def __init__(self, artist: Dict):
+        self.id = artist["id"]
+        self.name = artist["name"]
+        self.stage = artist["stage"]
+        self.start = datetime.fromisoformat(artist["startTime"])
+        self.end = datetime.fromisoformat(artist["endTime"])
+        self.day = artist.get("day") or self.start.strftime("%A")
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "stage": self.stage,
+            "day": self.day,
+            "startTime": self.start.isoformat(),
+            "endTime": self.end.isoformat()
+        }
+
+
+class _Timeline:
+    """Sets sorted by start with a parallel array of start times for bisect"""
+    __slots__ = ("sets", "starts")
+
+    def __init__(self, sets: Iterable[ScheduledSet]):
+        self.sets = sorted(sets, key=lambda s: (s.start, s.end, s.id))
+        self.starts = [s.start for s in self.sets]
+
+
+class ScheduleIndex:
+    def __init__(self, artists: List[Dict], version: str = ""):
+        self.version = version
+        sets = []
+        for artist in artists:
+            try:
+                sets.append(ScheduledSet(artist))
+            except (KeyError, ValueError):
+                continue
+
+        self.all = _Timeline(sets)
+        by_stage: Dict[str, List[ScheduledSet]] = defaultdict(list)
+        for s in sets:
+            by_stage[s.stage].append(s)
+        self.stages = {stage: _Timeline(stage_sets) for stage, stage_sets in by_stage.items()}
+        self.by_id = {s.id: s for s in sets}
+        # Bounds how far back a set that is still running can have started
+        self.max_duration = max((s.end - s.start for s in sets), default=timedelta(0))
+
+    def playing_at(self, when: datetime) -> List[ScheduledSet]:
+        """Sets on stage at a moment; one bisect per stage since a stage plays one set at a time"""
+        playing = []
+        for timeline in self.stages.values():
+            i = bisect_right(timeline.starts, when) - 1
+            if i >= 0 and timeline.sets[i].end > when:
+                playing.append(timeline.sets[i])
+        return sorted(playing, key=lambda s: s.start)
+
+    def next_per_stage(self, when: datetime) -> List[ScheduledSet]:
+        """The next set to start on each stage after a moment"""
+        upcoming = []
+        for timeline in self.stages.values():
+            i = bisect_right(timeline.starts, when)
+            if i < len(timeline.sets):
+                upcoming.append(timeline.sets[i])
+        return sorted(upcoming, key=lambda s: s.start)
+
+    def overlapping(self, start: datetime, end: datetime, exclude: Optional[str] = None) -> List[ScheduledSet]:
+        """Sets that overlap [start, end)"""
+        lo = bisect_left(self.all.starts, start - self.max_duration)
+        hi = bisect_left(self.all.starts, end)
+        return [s for s in self.all.sets[lo:hi] if s.end > start and s.id != exclude]
+
+    def favorites_timeline(self, artist_ids: Iterable[str]) -> List[ScheduledSet]:
+        """A user's starred sets sorted by start"""
+        return sorted(
+            (self.by_id[artist_id] for artist_id in set(artist_ids) if artist_id in self.by_id),
+            key=lambda s: (s.start, s.end, s.id)
+        )
+
+    def next_for(self, artist_ids: Iterable[str], when: datetime) -> Tuple[List[ScheduledSet], Optional[ScheduledSet]]:
+        """Starred sets playing now and the next starred set to start"""
+        favorites = self.favorites_timeline(artist_ids)
+        starts = [s.start for s in favorites]
+        i = bisect_right(starts, when)
+        playing = [s for s in favorites[max(0, bisect_left(starts, when - self.max_duration)):i] if s.end > when]
+        return playing, favorites[i] if i < len(favorites) else None
+
+    def conflicts(self, artist_ids: Iterable[str]) -> List[Tuple[ScheduledSet, ScheduledSet]]:
+        """Pairs of starred sets that overlap, by a sweep over start order"""
+        favorites = self.favorites_timeline(artist_ids)
+        pairs = []
+        for i, current in enumerate(favorites):
+            for other in favorites[i + 1:]:
+                if other.start >= current.end:
+                    break
+                pairs.append((current, other))
+        return pairs
+
+
+class ScheduleService:
+    def __init__(self, lineup_cache: LineupCache):
+        self.lineup_cache = lineup_cache
+        self._index: Optional[ScheduleIndex] = None
+
+    async def index(self) -> ScheduleIndex:
+        """The schedule index for the current lineup, rebuilt only when the lineup changes"""
+        lineup = await self.lineup_cache.get()
+        if self._index is None or self._index.version != lineup.etag:
+            self._index = ScheduleIndex(lineup.artists, lineup.etag)
+            logger.info(f"Built schedule index over {len(self._index.by_id)} sets on {len(self._index.stages)} stages")
+        return self._index
@@ -1,12 +1,14 @@
-from fastapi import FastAPI, APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 import os
+import asyncio
 import logging
 import json
 import uuid
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
@@ -18,6 +20,18 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from chat_service import DaisyDukeBotService
 from location_service import LocationService
 from weather_service import WeatherService
+from lineup_loader import seed_lineup
+from lineup_cache import LineupCache, accepts_gzip, etag_matches
+from favorites_service import FavoritesService, encode_lineup
+from schedule_index import ScheduleService
+from itinerary import ItineraryPlanner
+from group_consensus import GroupConsensus
+from lineup_search import LineupSearch
+from festival_calendar import FESTIVAL_TZ, festival_now
+from admission_control import AdmissionRejected
+from chat_archiver import SessionArchived
+from llm_ledger import MAX_REPORT_MINUTES
+from metrics import metrics
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -27,10 +41,71 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# WebSocket connection manager for real-time features
+class ConnectionManager:
+    def __init__(self):
+        self.active_connections: List[WebSocket] = []
+        # topic -> sockets subscribed to it
+        self.subscriptions: Dict[str, Set[WebSocket]] = defaultdict(set)
+
+    async def connect(self, websocket: WebSocket):
+        await websocket.accept()
+        self.active_connections.append(websocket)
+
+    def disconnect(self, websocket: WebSocket):
+        self.active_connections.remove(websocket)
+        for subscribers in self.subscriptions.values():
+            subscribers.discard(websocket)
+
+    def subscribe(self, websocket: WebSocket, topic: str):
+        self.subscriptions[topic].add(websocket)
+
+    def unsubscribe(self, websocket: WebSocket, topic: str):
+        self.subscriptions[topic].discard(websocket)
+
+    async def send_personal_message(self, message: str, websocket: WebSocket):
+        await websocket.send_text(message)
+
+    async def broadcast(self, message: dict):
+        for connection in self.active_connections:
+            try:
+                await connection.send_json(message)
+            except:
+                self.active_connections.remove(connection)
+
+    async def publish(self, topic: str, message: dict):
+        """Send a message to the sockets subscribed to a topic"""
+        for connection in list(self.subscriptions.get(topic, ())):
+            try:
+                await connection.send_json(message)
+            except Exception:
+                self.subscriptions[topic].discard(connection)
+
+manager = ConnectionManager()
+
+async def publish_weather_alerts(changes: dict):
+    await manager.publish("weather_alerts", {"type": "weather_alerts", **changes})
+
 # Initialize services
-chat_service = DaisyDukeBotService(client)
+lineup_cache = LineupCache(db, ttl=float(os.environ.get('LINEUP_CACHE_TTL', '5')))
+# Alerts are evaluated once per forecast refresh and pushed to subscribers
+weather_service = WeatherService(
+    ttl=float(os.environ.get('WEATHER_CACHE_TTL', '300')),
+    lineup=lineup_cache.artists,
+    on_alerts=publish_weather_alerts
+)
 location_service = LocationService(client)
-weather_service = WeatherService()
+favorites_service = FavoritesService(db, lineup_cache)
+schedule_service = ScheduleService(lineup_cache)
+itinerary_planner = ItineraryPlanner()
+group_consensus = GroupConsensus(db)
+lineup_search = LineupSearch(lineup_cache)
+chat_service = DaisyDukeBotService(
+    client,
+    weather_service=weather_service,
+    group_snapshot=location_service.group_snapshot,
+    lineup_cache=lineup_cache
+)
 
 # Create the main app
 app = FastAPI(title="Barefoot Buddy API")
@@ -74,30 +149,6 @@ class GhostModeUpdate(BaseModel):
 class PresenceUpdate(BaseModel):
     online: bool
 
-# WebSocket connection manager for real-time features
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
-
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except:
-                self.active_connections.remove(connection)
-
-manager = ConnectionManager()
-
 # ===== BASIC ENDPOINTS =====
 
 @api_router.get("/")
@@ -108,6 +159,21 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow()}
 
+@api_router.get("/metrics")
+async def get_metrics():
+    """In-process counters and latency histograms"""
+    snapshot = metrics.snapshot()
+    snapshot["chat_admission"] = chat_service.admission.stats()
+    return snapshot
+
+@api_router.get("/metrics/llm")
+async def get_llm_metrics(minutes: int = Query(60, ge=1, le=MAX_REPORT_MINUTES)):
+    """LLM and tool call ledger: counts, tokens and p50/p95/p99 latency per call type"""
+    try:
+        return await chat_service.ledger.report(minutes)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.dict()
@@ -128,32 +194,104 @@ async def get_weather():
     weather_data = await weather_service.get_current_weather()
     return weather_data
 
+@api_router.get("/weather/alerts")
+async def get_weather_alerts():
+    """Active weather alerts from the latest forecast"""
+    return {"alerts": weather_service.alerts}
+
+@api_router.get("/weather/point")
+async def get_weather_at(lat: float, lng: float):
+    """Current weather near a coordinate, shared by everyone in the same grid cell"""
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise HTTPException(status_code=400, detail="Invalid coordinates")
+    return await weather_service.get_weather_at(lat, lng)
+
+@api_router.get("/weather/forecast")
+async def get_weather_forecast(at: Optional[datetime] = None):
+    """Hourly forecast for the festival weekend, or a single hour with ?at="""
+    forecast = await weather_service.get_forecast()
+    if forecast is None:
+        raise HTTPException(status_code=503, detail="Forecast is not available yet")
+    if at is None:
+        return forecast
+    hour = weather_service.forecast.at(at)
+    if hour is None:
+        raise HTTPException(status_code=404, detail="Hour is outside the forecast window")
+    return hour
+
 # ===== CHAT ENDPOINTS =====
 
 @api_router.post("/chat/session")
 async def create_chat_session(session_data: ChatSessionCreate):
-    """Create a new chat session"""
+    """Resume the user's active chat session, or create one"""
     try:
-        session_id = await chat_service.create_chat_session(session_data.user_id)
-        return {"session_id": session_id, "status": "created"}
+        session = await chat_service.get_or_create_session(session_data.user_id)
+        return {
+            "session_id": session["session_id"],
+            "status": "created" if session["created"] else "resumed"
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/chat/history/{session_id}")
-async def get_chat_history(session_id: str):
-    """Get chat history for a session"""
+async def get_chat_history(session_id: str, before: Optional[str] = None, limit: int = 50):
+    """Get chat history for a session, newest page first; pass next_cursor as before to page back"""
     try:
-        history = await chat_service.get_chat_history(session_id)
-        return {"messages": history}
+        return await chat_service.get_chat_history(session_id, before=before, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.get("/chat/search")
+async def search_chat_history(user_id: str, q: str, limit: int = 20):
+    """Search a user's chat messages, returning ranked snippets"""
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query must not be empty")
+    try:
+        results = await chat_service.search_chat_history(user_id, q, limit=limit)
+        return {"query": q, "results": results}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def run_until_disconnect(request: Request, coro, poll_interval: float = 0.25):
+    """Run coro, cancelling it if the client disconnects first; returns None when abandoned"""
+    task = asyncio.create_task(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                return None
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
 @api_router.post("/chat/{session_id}")
-async def send_chat_message(session_id: str, message: ChatMessage, user_id: Optional[str] = "anonymous"):
+async def send_chat_message(session_id: str, message: ChatMessage, request: Request, user_id: Optional[str] = "anonymous"):
     """Send a message to Daisy DukeBot"""
     try:
-        response = await chat_service.send_message(session_id, message.message, user_id)
+        response = await run_until_disconnect(
+            request, chat_service.send_message(session_id, message.message, user_id)
+        )
+        if response is None:
+            # Client closed the chat panel; nobody is listening for this reply
+            return Response(status_code=499)
         return response
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Daisy's a little busy right now ({e.reason}), try again shortly",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except SessionArchived as e:
+        raise HTTPException(status_code=410, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -198,17 +336,13 @@ async def get_group_locations(group_id: str = "default", exclude_user: Optional[
 async def get_group_stats(group_id: str = "default"):
     """Get group statistics including both visible and ghost users"""
     try:
-        # Get all user locations from MongoDB (includes ghost users)
-        all_locations = await db.user_locations.find({}).to_list(100)
-        
-        total_users = len(all_locations)
-        visible_users = len([loc for loc in all_locations if not loc.get("ghost_mode", False)])
-        ghost_users = len([loc for loc in all_locations if loc.get("ghost_mode", False)])
+        # Shared snapshot of user_locations (includes ghost users in the counts)
+        snapshot = await location_service.group_snapshot.get(group_id)
         
         return {
-            "total": total_users,
-            "visible": visible_users, 
-            "ghost": ghost_users
+            "total": snapshot["total_users"],
+            "visible": snapshot["visible_users"], 
+            "ghost": snapshot["ghost_users"]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -259,35 +393,163 @@ async def get_group_presence(group_id: str = "default"):
 # ===== FESTIVAL DATA ENDPOINTS =====
 
 @api_router.get("/artists")
-async def get_artists():
-    """Get festival artists and lineup"""
+async def get_artists(request: Request, user_id: Optional[str] = None):
+    """Get festival artists and lineup, with isStarred from the user's favorites if given"""
+    if user_id:
+        try:
+            etag, artists, starred = await favorites_service.lineup_for(user_id)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            metrics.incr("lineup.not_modified")
+            return Response(status_code=304, headers=headers)
+        return Response(content=encode_lineup(artists, starred), media_type="application/json", headers=headers)
+
     try:
-        artists = await db.artists.find().to_list(1000)
-        # Convert ObjectId to string for JSON serialization
-        for artist in artists:
-            artist["_id"] = str(artist["_id"])
-        return {"artists": artists}
+        lineup = await lineup_cache.get()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    headers = {"ETag": lineup.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if lineup.matches(request.headers.get("if-none-match")):
+        metrics.incr("lineup.not_modified")
+        return Response(status_code=304, headers=headers)
+    if lineup.gzipped is not None and accepts_gzip(request.headers.get("accept-encoding")):
+        return Response(content=lineup.gzipped, media_type="application/json", headers={**headers, "Content-Encoding": "gzip"})
+    return Response(content=lineup.body, media_type="application/json", headers=headers)
+
+# Declared ahead of the /artists/{artist_id} routes so "search" is never taken for an id
+@api_router.get("/artists/search")
+async def search_artists(q: str = "", limit: int = Query(10, ge=1, le=50)):
+    """Prefix search over artist names and stages, for as-you-type lookups"""
+    try:
+        return {"query": q, "results": await lineup_search.search(q, limit)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.post("/artists/{artist_id}/star")
 async def toggle_artist_star(artist_id: str, user_id: Optional[str] = "anonymous"):
-    """Toggle star status for an artist"""
+    """Toggle star status for an artist in the user's favorites"""
     try:
-        # Get current star status
-        artist = await db.artists.find_one({"id": artist_id})
-        if not artist:
+        lineup = await lineup_cache.get()
+        if artist_id not in lineup.ids:
             raise HTTPException(status_code=404, detail="Artist not found")
         
-        new_starred = not artist.get("isStarred", False)
-        
-        # Update star status
-        await db.artists.update_one(
-            {"id": artist_id},
-            {"$set": {"isStarred": new_starred}}
-        )
+        new_starred = await favorites_service.toggle(user_id, artist_id)
+        group_consensus.invalidate_user(user_id)
         
         return {"artist_id": artist_id, "isStarred": new_starred}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _festival_time(at: Optional[datetime]) -> datetime:
+    """Festival-local naive time for a query, defaulting to now"""
+    if at is None:
+        return festival_now()
+    if at.tzinfo is not None:
+        return at.astimezone(FESTIVAL_TZ).replace(tzinfo=None)
+    return at
+
+@api_router.get("/schedule/now")
+async def get_now_playing(at: Optional[datetime] = None):
+    """Sets on stage now and the next set on each stage"""
+    try:
+        index = await schedule_service.index()
+        when = _festival_time(at)
+        return {
+            "at": when.isoformat(),
+            "playing": [s.to_dict() for s in index.playing_at(when)],
+            "up_next": [s.to_dict() for s in index.next_per_stage(when)]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/schedule/next")
+async def get_next_favorite(user_id: str, at: Optional[datetime] = None):
+    """The user's starred sets playing now and their next starred set"""
+    try:
+        index = await schedule_service.index()
+        artist_ids, _ = await favorites_service.get(user_id)
+        when = _festival_time(at)
+        playing, upcoming = index.next_for(artist_ids, when)
+        return {
+            "at": when.isoformat(),
+            "playing": [s.to_dict() for s in playing],
+            "next": upcoming.to_dict() if upcoming else None
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/schedule/conflicts")
+async def get_schedule_conflicts(user_id: Optional[str] = None, artist_id: Optional[str] = None):
+    """Overlapping starred sets for a user, or the sets overlapping one artist's set"""
+    if not user_id and not artist_id:
+        raise HTTPException(status_code=400, detail="Pass user_id or artist_id")
+    try:
+        index = await schedule_service.index()
+        if artist_id:
+            target = index.by_id.get(artist_id)
+            if target is None:
+                raise HTTPException(status_code=404, detail="Artist not found")
+            overlaps = index.overlapping(target.start, target.end, exclude=artist_id)
+            return {"artist": target.to_dict(), "overlapping": [s.to_dict() for s in overlaps]}
+
+        artist_ids, _ = await favorites_service.get(user_id)
+        return {
+            "user_id": user_id,
+            "conflicts": [
+                {
+                    "sets": [first.to_dict(), second.to_dict()],
+                    "overlap_minutes": int((min(first.end, second.end) - second.start).total_seconds() // 60)
+                }
+                for first, second in index.conflicts(artist_ids)
+            ]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/schedule/itinerary")
+async def get_itinerary(
+    user_id: str,
+    must_see: Optional[List[str]] = Query(None),
+    walk_minutes: Optional[int] = Query(None, ge=0, le=60)
+):
+    """Clash-free plan over the user's starred sets, weighting must-see artists higher"""
+    try:
+        index = await schedule_service.index()
+        artist_ids, _ = await favorites_service.get(user_id)
+        return {"user_id": user_id, **itinerary_planner.plan(index, artist_ids, must_see or (), walk_minutes)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/groups/{group_id}/schedule")
+async def get_group_schedule(
+    group_id: str,
+    members: Optional[List[str]] = Query(None),
+    limit: int = Query(10, ge=1, le=100)
+):
+    """Sets most of the group starred, plus a group itinerary to meet up at"""
+    try:
+        if not members:
+            # Default to everyone sharing their location with the group
+            snapshot = await location_service.group_snapshot.get(group_id)
+            members = [loc["user_id"] for loc in snapshot["locations"]]
+        index = await schedule_service.index()
+        return await group_consensus.schedule(group_id, members, index, limit=limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/users/{user_id}/favorites")
+async def get_user_favorites(user_id: str):
+    """Artist ids the user has starred"""
+    try:
+        artist_ids, _ = await favorites_service.get(user_id)
+        return {"user_id": user_id, "artist_ids": artist_ids}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -392,6 +654,16 @@ async def websocket_endpoint(websocket: WebSocket):
             # Handle different message types
             if message.get("type") == "ping":
                 await websocket.send_json({"type": "pong"})
+            elif message.get("type") == "subscribe":
+                topic = message.get("topic")
+                manager.subscribe(websocket, topic)
+                if topic == "weather_alerts":
+                    # New subscribers start from the current alert set; later messages are changes only
+                    await websocket.send_json({
+                        "type": "weather_alerts", "added": weather_service.alerts, "updated": [], "cleared": []
+                    })
+            elif message.get("type") == "unsubscribe":
+                manager.unsubscribe(websocket, message.get("topic"))
             elif message.get("type") == "location_update":
                 # Broadcast location updates to all connected clients
                 await manager.broadcast(message)
@@ -413,388 +685,27 @@ logger = logging.getLogger(__name__)
 async def startup_event():
     """Initialize database with festival data if needed"""
     logger.info("Starting Barefoot Buddy API...")
+    chat_service.chat_writer.start()
+    await chat_service.ensure_indexes()
+    chat_service.archiver.start()
+    await chat_service.ledger.ensure_indexes()
+    chat_service.ledger.start()
+    await favorites_service.ensure_indexes()
     
-    # Clear existing artists and repopulate with full data
-    await db.artists.delete_many({})
-    logger.info("Cleared existing artists data")
-    await populate_artists_data()
+    # Apply lineup file changes, if any; stars survive and only one worker seeds
+    result = await seed_lineup(db)
+    logger.info(f"Lineup {result['status']} (version {result['version'][:12]})")
+    if result["status"] == "seeded":
+        lineup_cache.invalidate()
+    await chat_service.knowledge.refresh(force=True)
+    # After the lineup is seeded, so the first alert evaluation sees the set times
+    weather_service.start()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    # Flush queued chat writes before the connection goes away
+    await chat_service.archiver.stop()
+    await chat_service.chat_writer.stop()
+    await chat_service.ledger.stop()
+    await weather_service.stop()
     client.close()
-
-async def populate_artists_data():
-    """Populate database with festival artists from mock data"""
-    artists_data = [
-        # Thursday, June 19 - Coors Light Main Stage
-        {
-            "id": "1",
-            "name": "Mara Justine",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-19T15:30:00",
-            "endTime": "2025-06-19T16:30:00",
-            "isStarred": False,
-            "day": "Thursday"
-        },
-        {
-            "id": "2",
-            "name": "Not Leaving Sober",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-19T16:30:00",
-            "endTime": "2025-06-19T17:30:00",
-            "isStarred": False,
-            "day": "Thursday"
-        },
-        {
-            "id": "3",
-            "name": "Tigirlily Gold",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-19T17:30:00",
-            "endTime": "2025-06-19T19:00:00",
-            "isStarred": True,
-            "day": "Thursday"
-        },
-        {
-            "id": "4",
-            "name": "Colt Ford",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-19T19:00:00",
-            "endTime": "2025-06-19T20:30:00",
-            "isStarred": False,
-            "day": "Thursday"
-        },
-        {
-            "id": "5",
-            "name": "Megan Moroney",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-19T20:30:00",
-            "endTime": "2025-06-19T22:00:00",
-            "isStarred": True,
-            "day": "Thursday"
-        },
-        {
-            "id": "6",
-            "name": "Rascal Flatts",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-19T22:00:00",
-            "endTime": "2025-06-19T23:30:00",
-            "isStarred": True,
-            "day": "Thursday"
-        },
-        # Thursday, June 19 - Patrón Tequila Stage
-        {
-            "id": "7",
-            "name": "12/OC",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-19T20:00:00",
-            "endTime": "2025-06-19T21:30:00",
-            "isStarred": False,
-            "day": "Thursday"
-        },
-        {
-            "id": "8",
-            "name": "Kevin Mac",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-19T21:30:00",
-            "endTime": "2025-06-19T23:00:00",
-            "isStarred": False,
-            "day": "Thursday"
-        },
-        # Friday, June 20 - Coors Light Main Stage
-        {
-            "id": "9",
-            "name": "Gillian Smith",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-20T15:00:00",
-            "endTime": "2025-06-20T16:00:00",
-            "isStarred": False,
-            "day": "Friday"
-        },
-        {
-            "id": "10",
-            "name": "Avery Anna",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-20T16:00:00",
-            "endTime": "2025-06-20T17:30:00",
-            "isStarred": False,
-            "day": "Friday"
-        },
-        {
-            "id": "11",
-            "name": "George Birge",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-20T17:30:00",
-            "endTime": "2025-06-20T19:00:00",
-            "isStarred": False,
-            "day": "Friday"
-        },
-        {
-            "id": "12",
-            "name": "Sam Barber",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-20T19:00:00",
-            "endTime": "2025-06-20T20:30:00",
-            "isStarred": True,
-            "day": "Friday"
-        },
-        {
-            "id": "13",
-            "name": "Warren Zeiders",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-20T20:30:00",
-            "endTime": "2025-06-20T22:00:00",
-            "isStarred": True,
-            "day": "Friday"
-        },
-        {
-            "id": "14",
-            "name": "Lainey Wilson",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-20T22:00:00",
-            "endTime": "2025-06-20T23:30:00",
-            "isStarred": True,
-            "day": "Friday"
-        },
-        # Friday, June 20 - Patrón Tequila Stage
-        {
-            "id": "15",
-            "name": "Samantha Spanò",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-20T13:30:00",
-            "endTime": "2025-06-20T14:30:00",
-            "isStarred": False,
-            "day": "Friday"
-        },
-        {
-            "id": "16",
-            "name": "Lauren Davidson",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-20T14:30:00",
-            "endTime": "2025-06-20T15:30:00",
-            "isStarred": False,
-            "day": "Friday"
-        },
-        {
-            "id": "17",
-            "name": "Kaitlin Butts",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-20T15:30:00",
-            "endTime": "2025-06-20T16:30:00",
-            "isStarred": False,
-            "day": "Friday"
-        },
-        {
-            "id": "18",
-            "name": "LANCO",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-20T16:30:00",
-            "endTime": "2025-06-20T18:00:00",
-            "isStarred": True,
-            "day": "Friday"
-        },
-        {
-            "id": "19",
-            "name": "Meghan Patrick",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-20T20:00:00",
-            "endTime": "2025-06-20T21:30:00",
-            "isStarred": False,
-            "day": "Friday"
-        },
-        {
-            "id": "20",
-            "name": "Whey Jennings",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-20T21:30:00",
-            "endTime": "2025-06-20T23:00:00",
-            "isStarred": False,
-            "day": "Friday"
-        },
-        # Saturday, June 21 - Coors Light Main Stage
-        {
-            "id": "21",
-            "name": "Willow Avalon",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-21T16:00:00",
-            "endTime": "2025-06-21T17:30:00",
-            "isStarred": False,
-            "day": "Saturday"
-        },
-        {
-            "id": "22",
-            "name": "Larry Fleet",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-21T17:30:00",
-            "endTime": "2025-06-21T19:00:00",
-            "isStarred": True,
-            "day": "Saturday"
-        },
-        {
-            "id": "23",
-            "name": "Boyz II Men",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-21T19:00:00",
-            "endTime": "2025-06-21T20:30:00",
-            "isStarred": True,
-            "day": "Saturday"
-        },
-        {
-            "id": "24",
-            "name": "Chris Janson",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-21T20:30:00",
-            "endTime": "2025-06-21T22:00:00",
-            "isStarred": False,
-            "day": "Saturday"
-        },
-        {
-            "id": "25",
-            "name": "Jason Aldean",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-21T22:00:00",
-            "endTime": "2025-06-21T23:30:00",
-            "isStarred": True,
-            "day": "Saturday"
-        },
-        # Saturday, June 21 - Patrón Tequila Stage
-        {
-            "id": "26",
-            "name": "Holdyn Barder",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-21T13:30:00",
-            "endTime": "2025-06-21T15:30:00",
-            "isStarred": False,
-            "day": "Saturday"
-        },
-        {
-            "id": "27",
-            "name": "Don Louis",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-21T15:30:00",
-            "endTime": "2025-06-21T16:30:00",
-            "isStarred": False,
-            "day": "Saturday"
-        },
-        {
-            "id": "28",
-            "name": "Chris Cagle",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-21T16:30:00",
-            "endTime": "2025-06-21T18:00:00",
-            "isStarred": False,
-            "day": "Saturday"
-        },
-        {
-            "id": "29",
-            "name": "Austin Williams",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-21T20:00:00",
-            "endTime": "2025-06-21T21:30:00",
-            "isStarred": False,
-            "day": "Saturday"
-        },
-        {
-            "id": "30",
-            "name": "Lakeview",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-21T21:30:00",
-            "endTime": "2025-06-21T23:00:00",
-            "isStarred": False,
-            "day": "Saturday"
-        },
-        # Sunday, June 22 - Coors Light Main Stage
-        {
-            "id": "31",
-            "name": "Jelly Roll",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-22T22:00:00",
-            "endTime": "2025-06-22T23:30:00",
-            "isStarred": True,
-            "day": "Sunday"
-        },
-        {
-            "id": "32",
-            "name": "Jordan Davis",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-22T20:30:00",
-            "endTime": "2025-06-22T22:00:00",
-            "isStarred": True,
-            "day": "Sunday"
-        },
-        {
-            "id": "33",
-            "name": "Ella Langley",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-22T19:00:00",
-            "endTime": "2025-06-22T20:30:00",
-            "isStarred": False,
-            "day": "Sunday"
-        },
-        {
-            "id": "34",
-            "name": "Bayker Blankenship",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-22T17:30:00",
-            "endTime": "2025-06-22T19:00:00",
-            "isStarred": False,
-            "day": "Sunday"
-        },
-        {
-            "id": "35",
-            "name": "Davisson Brothers Band",
-            "stage": "Coors Light Main Stage",
-            "startTime": "2025-06-22T16:00:00",
-            "endTime": "2025-06-22T17:30:00",
-            "isStarred": False,
-            "day": "Sunday"
-        },
-        # Sunday, June 22 - Patrón Tequila Stage
-        {
-            "id": "36",
-            "name": "Chayce Beckham",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-22T21:30:00",
-            "endTime": "2025-06-22T23:00:00",
-            "isStarred": True,
-            "day": "Sunday"
-        },
-        {
-            "id": "37",
-            "name": "Lanie Gardner",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-22T20:00:00",
-            "endTime": "2025-06-22T21:30:00",
-            "isStarred": False,
-            "day": "Sunday"
-        },
-        {
-            "id": "38",
-            "name": "Cat Country B.O.T.B Winner",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-22T18:00:00",
-            "endTime": "2025-06-22T19:00:00",
-            "isStarred": False,
-            "day": "Sunday"
-        },
-        {
-            "id": "39",
-            "name": "Thomas Edwards",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-22T16:30:00",
-            "endTime": "2025-06-22T17:30:00",
-            "isStarred": False,
-            "day": "Sunday"
-        },
-        {
-            "id": "40",
-            "name": "The Jack Wharff Band",
-            "stage": "Patrón Tequila Stage",
-            "startTime": "2025-06-22T15:00:00",
-            "endTime": "2025-06-22T16:30:00",
-            "isStarred": False,
-            "day": "Sunday"
-        }
-    ]
-    
-    await db.artists.insert_many(artists_data)
-    logger.info(f"Inserted {len(artists_data)} artists into database")
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""
+Weather alert rules for the festival forecast. Rules run over the hourly
+forecast once per refresh; consecutive hours that trip a rule become one alert
+period, tagged with the sets it overlaps ("rain likely during Jason Aldean").
+"""
+import math
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# kind -> (forecast field, advisory threshold, warning threshold)
+ALERT_RULES = {
+    'heat': ('heatIndex', 90, 103),
+    'rain': ('precipitationProbability', 50, 80),
+    'uv': ('uvIndex', 8, 11),
+    'wind': ('windSpeed', 20, 30),
+}
+
+
+def heat_index(temp_f: float, humidity: float) -> float:
+    """NWS heat index (Rothfusz regression) in °F"""
+    simple = 0.5 * (temp_f + 61.0 + (temp_f - 68.0) * 1.2 + humidity * 0.094)
+    if (simple + temp_f) / 2 < 80:
+        return simple
+
+    hi = (-42.379 + 2.04901523 * temp_f + 10.14333127 * humidity
+          - 0.22475541 * temp_f * humidity - 0.00683783 * temp_f ** 2
+          - 0.05481717 * humidity ** 2 + 0.00122874 * temp_f ** 2 * humidity
+          + 0.00085282 * temp_f * humidity ** 2 - 0.00000199 * temp_f ** 2 * humidity ** 2)
+    if humidity < 13 and 80 <= temp_f <= 112:
+        hi -= ((13 - humidity) / 4) * math.sqrt((17 - abs(temp_f - 95)) / 17)
+    elif humidity > 85 and 80 <= temp_f <= 87:
+        hi += ((humidity - 85) / 10) * ((87 - temp_f) / 5)
+    return hi
+
+
+def _format_hour(dt: datetime) -> str:
+    return dt.strftime("%I %p").lstrip("0")
+
+
+def _describe(kind: str, peak: float, start: datetime, end: datetime, artists: List[str]) -> str:
+    what = {
+        'heat': f"Heat index up to {int(peak)}°F",
+        'rain': f"Rain likely ({int(peak)}%)",
+        'uv': f"UV index up to {peak:g}",
+        'wind': f"Wind up to {int(peak)} mph",
+    }[kind]
+    message = f"{what} {start.strftime('%A')} {_format_hour(start)}–{_format_hour(end)}"
+    if artists:
+        names = artists[0] if len(artists) == 1 else ", ".join(artists[:-1]) + f" and {artists[-1]}"
+        message += f", during {names}"
+    return message
+
+
+def _parse_sets(artists: List[Dict]) -> List[Tuple[datetime, datetime, str]]:
+    sets = []
+    for artist in artists:
+        try:
+            sets.append((datetime.fromisoformat(artist["startTime"]), datetime.fromisoformat(artist["endTime"]), artist["name"]))
+        except (KeyError, ValueError):
+            continue
+    sets.sort()
+    return sets
+
+
+def evaluate_alerts(forecast, artists: List[Dict], now: datetime) -> List[Dict]:
+    """Alert periods that have not ended yet; ids stay stable while a period is under way"""
+    current = int((now - forecast.start).total_seconds() // 3600)
+    sets = _parse_sets(artists)
+    temperature = forecast.series.get('temperature')
+    humidity = forecast.series.get('humidity')
+
+    alerts = []
+    for kind, (field, advisory, warning) in ALERT_RULES.items():
+        if field == 'heatIndex':
+            if temperature is None or humidity is None:
+                continue
+            values = [heat_index(t, h) for t, h in zip(temperature, humidity)]
+        else:
+            values = forecast.series.get(field)
+            if values is None:
+                continue
+
+        period: Optional[List[int]] = None
+        for index in range(len(values) + 1):
+            # NaN (missing hour) compares False and closes the period
+            hit = index < len(values) and values[index] >= advisory
+            if hit:
+                period = period or []
+                period.append(index)
+                continue
+            if not period:
+                continue
+            if period[-1] < current:
+                period = None
+                continue
+
+            peak = max(values[i] for i in period)
+            start = forecast.start + timedelta(hours=period[0])
+            end = forecast.start + timedelta(hours=period[-1] + 1)
+            overlapping = [name for set_start, set_end, name in sets if set_start < end and set_end > start]
+            peak = round(peak, 1) if kind == 'uv' else int(round(peak))
+            alerts.append({
+                'id': f"{kind}:{start.isoformat()}",
+                'kind': kind,
+                'severity': 'warning' if peak >= warning else 'advisory',
+                'start': start.isoformat(),
+                'end': end.isoformat(),
+                'peak': peak,
+                'artists': overlapping,
+                'message': _describe(kind, peak, start, end, overlapping)
+            })
+            period = None
+
+    alerts.sort(key=lambda alert: alert['start'])
+    return alerts
+
+
+def diff_alerts(previous: List[Dict], current: List[Dict]) -> Dict[str, List]:
+    """Alerts added, changed or cleared between two evaluations"""
+    before = {alert['id']: alert for alert in previous}
+    after = {alert['id']: alert for alert in current}
+    return {
+        'added': [alert for alert_id, alert in after.items() if alert_id not in before],
+        'updated': [alert for alert_id, alert in after.items() if alert_id in before and before[alert_id] != alert],
+        'cleared': [alert_id for alert_id in before if alert_id not in after]
+    }
@@ -1,14 +1,118 @@
 """
-Weather Service for real weather data using Open-Meteo (free, no API key needed)
+Weather Service for real weather data using Open-Meteo (free, no API key needed).
+Readings are cached in memory: a stale reading is served while a single
+background fetch refreshes it, and the last good reading outlives upstream
+outages. The hourly forecast for the festival weekend is prefetched the same
+way and kept as compact per-hour arrays. Weather for arbitrary coordinates is
+cached per coarse grid cell, and cold cells are fetched together in one
+multi-coordinate request. Alert rules run once per forecast refresh and only
+changes are handed to the on_alerts callback.
 """
-import requests
-from typing import Dict
+import asyncio
+import math
+import time
+from array import array
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import httpx
 import logging
 
+from festival_calendar import FESTIVAL_TZ, festival_dates, festival_now
+from metrics import metrics
+from weather_alerts import diff_alerts, evaluate_alerts
+
 logger = logging.getLogger(__name__)
 
+# Open-Meteo serves at most 16 days ahead
+MAX_FORECAST_DAYS = 16
+FALLBACK_FORECAST_DAYS = 4
+# Served when no forecast hour covers now (outside the window, or before the first forecast)
+DEFAULT_UV_INDEX = 6
+
+# Grid cells are identified by integer indices so keys compare exactly
+Cell = Tuple[int, int]
+
+HOURLY_FIELDS = {
+    # Open-Meteo variable -> our field name
+    'temperature_2m': 'temperature',
+    'precipitation_probability': 'precipitationProbability',
+    'uv_index': 'uvIndex',
+    'wind_speed_10m': 'windSpeed',
+    'relative_humidity_2m': 'humidity',
+}
+
+
+def forecast_window(today: date) -> Tuple[date, date]:
+    """Days to prefetch: the festival weekend, or the next few days once it is out of range"""
+    horizon = today + timedelta(days=MAX_FORECAST_DAYS - 1)
+    festival_start, festival_end = festival_dates()
+    start, end = max(today, festival_start), min(festival_end, horizon)
+    if start > end:
+        return today, today + timedelta(days=FALLBACK_FORECAST_DAYS - 1)
+    return start, end
+
+
+class HourlyForecast:
+    """Hourly forecast as one float array per field, indexed by hours since start"""
+    __slots__ = ('start', 'series', 'fetched_at', 'payload')
+
+    def __init__(self, start: datetime, series: Dict[str, array]):
+        self.start = start
+        self.series = series
+        self.fetched_at = datetime.utcnow()
+        # Built once per refresh so the endpoint never re-serializes the arrays
+        self.payload = {
+            'start': start.isoformat(),
+            'hours': len(self),
+            'fetchedAt': self.fetched_at.isoformat(),
+            **{name: [self._value(name, values[i]) for i in range(len(values))]
+               for name, values in series.items()}
+        }
+
+    @classmethod
+    def from_open_meteo(cls, hourly: Dict) -> 'HourlyForecast':
+        series = {
+            name: array('f', (math.nan if v is None else v for v in hourly[source]))
+            for source, name in HOURLY_FIELDS.items()
+        }
+        return cls(datetime.fromisoformat(hourly['time'][0]), series)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.series.values()), ()))
+
+    @staticmethod
+    def _value(name: str, value: float):
+        if math.isnan(value):
+            return None
+        return round(value, 1) if name == 'uvIndex' else int(round(value))
+
+    def at(self, when: datetime) -> Optional[Dict]:
+        """Forecast for the hour containing a festival-local time, or None outside the window"""
+        if when.tzinfo is not None:
+            when = when.astimezone(FESTIVAL_TZ).replace(tzinfo=None)
+        index = int((when - self.start).total_seconds() // 3600)
+        if not 0 <= index < len(self):
+            return None
+        hour = {'time': (self.start + timedelta(hours=index)).isoformat()}
+        for name, values in self.series.items():
+            hour[name] = self._value(name, values[index])
+        return hour
+
+
 class WeatherService:
-    def __init__(self):
+    def __init__(
+        self,
+        ttl: float = 300,
+        retry_interval: float = 30,
+        forecast_ttl: float = 1800,
+        grid_size: float = 0.1,
+        max_cells: int = 256,
+        batch_window: float = 0.05,
+        max_batch: int = 100,
+        lineup: Optional[Callable[[], Awaitable[List[Dict]]]] = None,
+        on_alerts: Optional[Callable[[Dict], Awaitable[None]]] = None,
+    ):
         # Using Open-Meteo free API (no key needed)
         self.base_url = "https://api.open-meteo.com/v1/forecast"
         
@@ -16,8 +120,233 @@ class WeatherService:
         self.wildwood_lat = 39.0056
         self.wildwood_lng = -74.8157
 
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self.forecast_ttl = forecast_ttl
+        self.http = httpx.AsyncClient(timeout=10)
+
+        self._current: Optional[Dict] = None
+        self._fetched_at = 0.0
+        self._fetched_at_utc: Optional[datetime] = None
+        self._last_attempt = 0.0
+        self.forecast: Optional[HourlyForecast] = None
+        self._forecast_fetched_at = 0.0
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        # Per-coordinate weather: ~0.1° cells (about 11 km) share one cached reading
+        self.grid_size = grid_size
+        self.max_cells = max_cells
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        # cell -> (fetched_at monotonic, fetched_at utc, reading), least recently used first
+        self._cells: "OrderedDict[Cell, Tuple[float, datetime, Dict]]" = OrderedDict()
+        self._cell_waiters: Dict[Cell, asyncio.Future] = {}
+        # cell -> monotonic time of the last upstream attempt, so a failing upstream isn't hit per request
+        self._cell_attempts: Dict[Cell, float] = {}
+        self._cell_batch: Optional[asyncio.Task] = None
+
+        # Alerts are re-evaluated when the forecast changes; lineup() supplies the set times
+        self.lineup = lineup
+        self.on_alerts = on_alerts
+        self.alerts: List[Dict] = []
+
+    def start(self):
+        """Keep the cached reading and forecast warm so requests never wait on Open-Meteo"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._cell_batch is not None:
+            self._cell_batch.cancel()
+        await self.http.aclose()
+
+    async def _run(self):
+        while True:
+            refreshes = [self.refresh()]
+            if self.forecast is None or time.monotonic() - self._forecast_fetched_at >= self.forecast_ttl:
+                refreshes.append(self.refresh_forecast())
+            await asyncio.gather(*refreshes)
+            await asyncio.sleep(self.ttl)
+
+    def age(self) -> Optional[float]:
+        """Seconds since the cached reading was fetched, or None if there is none"""
+        if self._current is None:
+            return None
+        return time.monotonic() - self._fetched_at
+
     async def get_current_weather(self) -> Dict:
         """Get current weather for Wildwood, NJ"""
+        if self._current is None:
+            metrics.incr("weather.cache.miss")
+            await self.refresh()
+        elif self.age() > self.ttl:
+            metrics.incr("weather.cache.stale")
+            if time.monotonic() - self._last_attempt >= self.retry_interval:
+                self._single_flight("current", self._fetch_current)
+        else:
+            metrics.incr("weather.cache.hit")
+
+        if self._current is None:
+            return self._get_mock_weather()
+
+        age = self.age()
+        hour = self.forecast.at(festival_now()) if self.forecast else None
+        return {
+            **self._current,
+            'uvIndex': hour['uvIndex'] if hour else DEFAULT_UV_INDEX,
+            'fetchedAt': self._fetched_at_utc.isoformat(),
+            'ageSeconds': int(age),
+            'isStale': age > self.ttl
+        }
+
+    def snap(self, lat: float, lng: float) -> Cell:
+        """Grid cell containing a coordinate"""
+        return round(lat / self.grid_size), round(lng / self.grid_size)
+
+    def cell_center(self, cell: Cell) -> Tuple[float, float]:
+        return round(cell[0] * self.grid_size, 4), round(cell[1] * self.grid_size, 4)
+
+    async def get_weather_at(self, lat: float, lng: float) -> Dict:
+        """Current weather for the grid cell containing a coordinate"""
+        cell = self.snap(lat, lng)
+        entry = self._cells.get(cell)
+        if entry is None:
+            metrics.incr("weather.cell.miss")
+            if self._should_fetch(cell):
+                entry = await asyncio.shield(self._queue_cells([cell])[cell])
+            else:
+                # Fetched moments ago and nothing came back; serve the fallback until the retry interval
+                metrics.incr("weather.cell.throttled")
+        else:
+            self._cells.move_to_end(cell)
+            if time.monotonic() - entry[0] > self.ttl:
+                metrics.incr("weather.cell.stale")
+                if self._should_fetch(cell):
+                    self._queue_cells([cell])
+            else:
+                metrics.incr("weather.cell.hit")
+
+        center_lat, center_lng = self.cell_center(cell)
+        if entry is None:
+            reading = self._get_mock_weather()
+        else:
+            age = time.monotonic() - entry[0]
+            reading = {
+                **entry[2],
+                'fetchedAt': entry[1].isoformat(),
+                'ageSeconds': int(age),
+                'isStale': age > self.ttl
+            }
+        return {**reading, 'cell': {'latitude': center_lat, 'longitude': center_lng}}
+
+    def _should_fetch(self, cell: Cell) -> bool:
+        """Whether the cell may go upstream now; records the attempt so retries wait retry_interval"""
+        now = time.monotonic()
+        last = self._cell_attempts.get(cell)
+        if last is not None and now - last < self.retry_interval and cell not in self._cell_waiters:
+            return False
+        self._cell_attempts[cell] = now
+        if len(self._cell_attempts) > 4 * self.max_cells:
+            # Cold cells that never got an entry are never evicted with it; forget expired attempts
+            for expired in [c for c, at in self._cell_attempts.items() if now - at >= self.retry_interval]:
+                del self._cell_attempts[expired]
+        return True
+
+    def _queue_cells(self, cells: Iterable[Cell]) -> Dict[Cell, asyncio.Future]:
+        """Add cells to the next batched fetch; returns a future per cell resolving to its cache entry"""
+        loop = asyncio.get_running_loop()
+        waiters = {}
+        for cell in cells:
+            if cell not in self._cell_waiters:
+                self._cell_waiters[cell] = loop.create_future()
+            waiters[cell] = self._cell_waiters[cell]
+        if self._cell_batch is None or self._cell_batch.done():
+            self._cell_batch = asyncio.create_task(self._fetch_cells())
+        return waiters
+
+    async def _fetch_cells(self):
+        # Let concurrent lookups for other cells join this batch
+        await asyncio.sleep(self.batch_window)
+        while self._cell_waiters:
+            cells = list(self._cell_waiters)[:self.max_batch]
+            waiters = {cell: self._cell_waiters.pop(cell) for cell in cells}
+            entries = {}
+            try:
+                entries = await self._fetch_cell_batch(cells)
+            finally:
+                # Resolve from the batch itself; a large batch may already be evicting its own cells
+                for cell, waiter in waiters.items():
+                    if not waiter.done():
+                        waiter.set_result(entries.get(cell, self._cells.get(cell)))
+
+    async def _fetch_cell_batch(self, cells: List[Cell]) -> Dict[Cell, Tuple[float, datetime, Dict]]:
+        entries = {}
+        centers = [self.cell_center(cell) for cell in cells]
+        try:
+            params = {
+                'latitude': ','.join(str(lat) for lat, _ in centers),
+                'longitude': ','.join(str(lng) for _, lng in centers),
+                'current_weather': 'true',
+                'temperature_unit': 'fahrenheit',
+                'windspeed_unit': 'mph'
+            }
+
+            response = await self.http.get(self.base_url, params=params)
+            metrics.incr("weather.cell.upstream_calls")
+
+            if response.status_code == 200:
+                data = response.json()
+                # One location comes back as an object, several as a list in request order
+                results = data if isinstance(data, list) else [data]
+                fetched_at, fetched_at_utc = time.monotonic(), datetime.utcnow()
+                for cell, result in zip(cells, results):
+                    entries[cell] = (fetched_at, fetched_at_utc, self._format_current(result['current_weather']))
+                    self._cells[cell] = entries[cell]
+                    self._cells.move_to_end(cell)
+                while len(self._cells) > self.max_cells:
+                    evicted, _ = self._cells.popitem(last=False)
+                    self._cell_attempts.pop(evicted, None)
+            else:
+                metrics.incr("weather.upstream.error")
+                logger.warning(f"Weather API returned status {response.status_code} for {len(cells)} cells")
+
+        except Exception as e:
+            metrics.incr("weather.upstream.error")
+            logger.error(f"Error fetching weather for {len(cells)} cells: {e}")
+        return entries
+
+    async def get_forecast(self) -> Optional[Dict]:
+        """The prefetched hourly forecast, fetching it first if nothing is cached yet"""
+        if self.forecast is None:
+            await self.refresh_forecast()
+        if self.forecast is None:
+            return None
+        return {**self.forecast.payload, 'ageSeconds': int(time.monotonic() - self._forecast_fetched_at)}
+
+    async def refresh(self):
+        """Fetch a new reading, joining the in-flight fetch if there is one"""
+        await asyncio.shield(self._single_flight("current", self._fetch_current))
+
+    async def refresh_forecast(self):
+        """Fetch the hourly forecast, joining the in-flight fetch if there is one"""
+        await asyncio.shield(self._single_flight("forecast", self._fetch_forecast))
+
+    def _single_flight(self, key: str, fetch: Callable[[], Awaitable[None]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None or task.done():
+            task = self._inflight[key] = asyncio.create_task(fetch())
+        return task
+
+    async def _fetch_current(self):
+        self._last_attempt = time.monotonic()
         try:
             # Open-Meteo free API parameters
             params = {
@@ -28,35 +357,89 @@ class WeatherService:
                 'windspeed_unit': 'mph'
             }
             
-            response = requests.get(self.base_url, params=params, timeout=10)
+            response = await self.http.get(self.base_url, params=params)
             
             if response.status_code == 200:
                 data = response.json()
-                current = data['current_weather']
-                
-                # Convert to our format
-                weather_data = {
-                    'temperature': int(current['temperature']),
-                    'description': self._get_description(current['weathercode']),
-                    'windSpeed': int(current['windspeed']),
-                    'uvIndex': 6,  # Static for now
-                    'icon': self._get_icon_type(current['weathercode']),
-                    'daisyComment': self._get_daisy_comment(
-                        int(current['temperature']), 
-                        self._get_description(current['weathercode'])
-                    ),
-                    'isLive': True
-                }
+                weather_data = self._format_current(data['current_weather'])
                 
+                self._current = weather_data
+                self._fetched_at = time.monotonic()
+                self._fetched_at_utc = datetime.utcnow()
                 logger.info(f"Successfully fetched live weather: {weather_data['temperature']}°F, {weather_data['description']}")
-                return weather_data
             else:
+                metrics.incr("weather.upstream.error")
                 logger.warning(f"Weather API returned status {response.status_code}")
-                return self._get_mock_weather()
                 
         except Exception as e:
+            metrics.incr("weather.upstream.error")
+            # Keep serving the last good reading; callers see its age
             logger.error(f"Error fetching weather: {e}")
-            return self._get_mock_weather()
+
+    async def _fetch_forecast(self):
+        start, end = forecast_window(festival_now().date())
+        try:
+            params = {
+                'latitude': self.wildwood_lat,
+                'longitude': self.wildwood_lng,
+                'hourly': ','.join(HOURLY_FIELDS),
+                'temperature_unit': 'fahrenheit',
+                'wind_speed_unit': 'mph',
+                # Hour strings come back in festival local time, like the set times
+                'timezone': 'America/New_York',
+                'start_date': start.isoformat(),
+                'end_date': end.isoformat()
+            }
+
+            response = await self.http.get(self.base_url, params=params)
+
+            if response.status_code == 200:
+                self.forecast = HourlyForecast.from_open_meteo(response.json()['hourly'])
+                self._forecast_fetched_at = time.monotonic()
+                logger.info(f"Fetched {len(self.forecast)}h weather forecast from {start} to {end}")
+                await self._update_alerts()
+            else:
+                metrics.incr("weather.upstream.error")
+                logger.warning(f"Weather forecast API returned status {response.status_code}")
+
+        except Exception as e:
+            metrics.incr("weather.upstream.error")
+            logger.error(f"Error fetching weather forecast: {e}")
+
+    async def _update_alerts(self):
+        """Evaluate alert rules against the new forecast and publish what changed"""
+        try:
+            artists = await self.lineup() if self.lineup else []
+            alerts = evaluate_alerts(self.forecast, artists, festival_now())
+        except Exception as e:
+            logger.error(f"Error evaluating weather alerts: {e}")
+            return
+
+        changes = diff_alerts(self.alerts, alerts)
+        self.alerts = alerts
+        if not any(changes.values()):
+            return
+        metrics.incr("weather.alerts.changed")
+        logger.info(f"Weather alerts changed: {len(changes['added'])} added, {len(changes['updated'])} updated, {len(changes['cleared'])} cleared")
+        if self.on_alerts:
+            try:
+                await self.on_alerts(changes)
+            except Exception as e:
+                logger.error(f"Error publishing weather alerts: {e}")
+
+    def _format_current(self, current: Dict) -> Dict:
+        """Convert an Open-Meteo current_weather block to our format"""
+        return {
+            'temperature': int(current['temperature']),
+            'description': self._get_description(current['weathercode']),
+            'windSpeed': int(current['windspeed']),
+            'icon': self._get_icon_type(current['weathercode']),
+            'daisyComment': self._get_daisy_comment(
+                int(current['temperature']), 
+                self._get_description(current['weathercode'])
+            ),
+            'isLive': True
+        }
 
     def _get_description(self, weather_code: int) -> str:
         """Convert weather code to description"""
@@ -105,7 +488,7 @@ class WeatherService:
             'temperature': 78,
             'description': 'Sunny',
             'windSpeed': 8,
-            'uvIndex': 6,
+            'uvIndex': DEFAULT_UV_INDEX,
             'icon': 'sun',
             'daisyComment': "Weather service is takin' a little break, sugar! But it's always beautiful at the beach!",
             'isLive': False
@@ -69,6 +69,44 @@ class BarefootBuddyTester:
             self.log_test_result("Health Endpoint", False, {"error": str(e)})
             return False
 
+    def test_metrics_endpoint(self):
+        """Test the metrics endpoint"""
+        try:
+            response = self.session.get(f"{BASE_URL}/metrics")
+            response.raise_for_status()
+            data = response.json()
+            
+            passed = "counters" in data and "histograms" in data and "chat_admission" in data
+            self.log_test_result("Metrics Endpoint", passed, data)
+            return passed
+        except Exception as e:
+            logger.error(f"Metrics endpoint test failed: {e}")
+            self.log_test_result("Metrics Endpoint", False, {"error": str(e)})
+            return False
+
+    def test_llm_metrics_endpoint(self):
+        """Test the LLM call ledger report endpoint"""
+        try:
+            response = self.session.get(f"{BASE_URL}/metrics/llm", params={"minutes": 60})
+            response.raise_for_status()
+            data = response.json()
+            
+            passed = "call_types" in data and isinstance(data["call_types"], dict)
+            if passed and data["call_types"]:
+                latency = next(iter(data["call_types"].values()))["latency_ms"]
+                passed = all(field in latency for field in ["count", "p50", "p95", "p99", "max"])
+            
+            # The window is bounded by the ledger's retention
+            too_long = self.session.get(f"{BASE_URL}/metrics/llm", params={"minutes": 100000})
+            passed = passed and too_long.status_code == 422
+            
+            self.log_test_result("LLM Metrics Endpoint", passed, data)
+            return passed
+        except Exception as e:
+            logger.error(f"LLM metrics endpoint test failed: {e}")
+            self.log_test_result("LLM Metrics Endpoint", False, {"error": str(e)})
+            return False
+
     def test_weather_endpoint(self):
         """Test the weather endpoint"""
         try:
@@ -86,6 +124,73 @@ class BarefootBuddyTester:
             self.log_test_result("Weather Endpoint", False, {"error": str(e)})
             return False
 
+    def test_weather_forecast_endpoint(self):
+        """Test the hourly weather forecast endpoint"""
+        try:
+            response = self.session.get(f"{BASE_URL}/weather/forecast")
+            response.raise_for_status()
+            data = response.json()
+            
+            series = ["temperature", "precipitationProbability", "uvIndex", "windSpeed"]
+            passed = data.get("hours", 0) > 0 and all(len(data.get(name, [])) == data["hours"] for name in series)
+            
+            self.log_test_result("Weather Forecast Endpoint", passed, {
+                "start": data.get("start"),
+                "hours": data.get("hours")
+            })
+            return passed
+        except Exception as e:
+            logger.error(f"Weather forecast endpoint test failed: {e}")
+            self.log_test_result("Weather Forecast Endpoint", False, {"error": str(e)})
+            return False
+
+    def test_weather_alerts_endpoint(self):
+        """Test the weather alerts endpoint"""
+        try:
+            response = self.session.get(f"{BASE_URL}/weather/alerts")
+            response.raise_for_status()
+            data = response.json()
+            
+            passed = isinstance(data.get("alerts"), list)
+            if passed and data["alerts"]:
+                passed = all(field in data["alerts"][0] for field in ["id", "kind", "severity", "start", "end", "message"])
+            
+            self.log_test_result("Weather Alerts Endpoint", passed, {"alert_count": len(data.get("alerts", []))})
+            return passed
+        except Exception as e:
+            logger.error(f"Weather alerts endpoint test failed: {e}")
+            self.log_test_result("Weather Alerts Endpoint", False, {"error": str(e)})
+            return False
+
+    def test_weather_point_endpoint(self):
+        """Test per-coordinate weather and its grid cell snapping"""
+        try:
+            response = self.session.get(f"{BASE_URL}/weather/point", params={"lat": 39.0056, "lng": -74.8157})
+            response.raise_for_status()
+            data = response.json()
+            
+            required_fields = ["temperature", "description", "windSpeed", "icon", "daisyComment", "cell"]
+            passed = all(field in data for field in required_fields)
+            if passed:
+                # Nearby coordinates share one grid cell
+                nearby = self.session.get(f"{BASE_URL}/weather/point", params={"lat": 39.0101, "lng": -74.8123})
+                nearby.raise_for_status()
+                passed = nearby.json().get("cell") == data["cell"]
+            
+            invalid = self.session.get(f"{BASE_URL}/weather/point", params={"lat": 123, "lng": -74.8157})
+            passed = passed and invalid.status_code == 400
+            
+            self.log_test_result("Weather Point Endpoint", passed, {
+                "cell": data.get("cell"),
+                "is_live": data.get("isLive"),
+                "invalid_status": invalid.status_code
+            })
+            return passed
+        except Exception as e:
+            logger.error(f"Weather point endpoint test failed: {e}")
+            self.log_test_result("Weather Point Endpoint", False, {"error": str(e)})
+            return False
+
     def test_artists_endpoint(self):
         """Test the artists endpoint"""
         try:
@@ -110,6 +215,39 @@ class BarefootBuddyTester:
             self.log_test_result("Artists Endpoint", False, {"error": str(e)})
             return False
 
+    def test_artists_not_modified(self):
+        """Test that a repeat lineup request with the ETag gets 304 Not Modified"""
+        try:
+            response = self.session.get(f"{BASE_URL}/artists")
+            response.raise_for_status()
+            etag = response.headers.get("ETag")
+            
+            repeat = self.session.get(f"{BASE_URL}/artists", headers={"If-None-Match": etag or ""})
+            passed = bool(etag) and repeat.status_code == 304
+            
+            self.log_test_result("Artists Not Modified", passed, {"etag": etag, "repeat_status": repeat.status_code})
+            return passed
+        except Exception as e:
+            logger.error(f"Artists not modified test failed: {e}")
+            self.log_test_result("Artists Not Modified", False, {"error": str(e)})
+            return False
+
+    def test_artist_search(self):
+        """Test accent-folded prefix search over the lineup"""
+        try:
+            response = self.session.get(f"{BASE_URL}/artists/search", params={"q": "spano"})
+            response.raise_for_status()
+            data = response.json()
+            
+            names = [artist["name"] for artist in data.get("results", [])]
+            passed = "Samantha Spanò" in names
+            self.log_test_result("Artist Search", passed, {"results": names})
+            return passed
+        except Exception as e:
+            logger.error(f"Artist search test failed: {e}")
+            self.log_test_result("Artist Search", False, {"error": str(e)})
+            return False
+
     def test_artist_starring(self):
         """Test starring an artist"""
         try:
@@ -141,6 +279,95 @@ class BarefootBuddyTester:
             self.log_test_result("Artist Starring", False, {"error": str(e)})
             return False
 
+    def test_user_favorites(self):
+        """Test that stars are per user and merged into that user's lineup"""
+        try:
+            response = self.session.get(f"{BASE_URL}/users/{self.test_user_id}/favorites")
+            response.raise_for_status()
+            favorites = response.json().get("artist_ids", [])
+            
+            response = self.session.get(f"{BASE_URL}/artists", params={"user_id": self.test_user_id})
+            response.raise_for_status()
+            starred = {artist["id"] for artist in response.json()["artists"] if artist["isStarred"]}
+            
+            passed = len(favorites) > 0 and starred == set(favorites)
+            self.log_test_result("User Favorites", passed, {"favorites": favorites, "starred_in_lineup": sorted(starred)})
+            return passed
+        except Exception as e:
+            logger.error(f"User favorites test failed: {e}")
+            self.log_test_result("User Favorites", False, {"error": str(e)})
+            return False
+
+    def test_schedule_endpoints(self):
+        """Test now playing, next favorite and conflict queries"""
+        try:
+            response = self.session.get(f"{BASE_URL}/schedule/now", params={"at": "2025-06-20T20:45:00"})
+            response.raise_for_status()
+            now_data = response.json()
+            
+            response = self.session.get(f"{BASE_URL}/schedule/next", params={"user_id": self.test_user_id, "at": "2025-06-19T12:00:00"})
+            response.raise_for_status()
+            next_data = response.json()
+            
+            response = self.session.get(f"{BASE_URL}/schedule/conflicts", params={"user_id": self.test_user_id})
+            response.raise_for_status()
+            conflict_data = response.json()
+            
+            passed = (
+                len(now_data.get("playing", [])) > 0
+                and "next" in next_data
+                and isinstance(conflict_data.get("conflicts"), list)
+            )
+            self.log_test_result("Schedule Endpoints", passed, {
+                "playing": [s["name"] for s in now_data.get("playing", [])],
+                "next_favorite": (next_data.get("next") or {}).get("name"),
+                "conflicts": len(conflict_data.get("conflicts", []))
+            })
+            return passed
+        except Exception as e:
+            logger.error(f"Schedule endpoints test failed: {e}")
+            self.log_test_result("Schedule Endpoints", False, {"error": str(e)})
+            return False
+
+    def test_itinerary_endpoint(self):
+        """Test the personal itinerary planner"""
+        try:
+            response = self.session.get(f"{BASE_URL}/schedule/itinerary", params={"user_id": self.test_user_id})
+            response.raise_for_status()
+            data = response.json()
+            
+            passed = all(field in data for field in ["plan", "skipped", "total_minutes"])
+            self.log_test_result("Itinerary Endpoint", passed, {
+                "plan": [stop["name"] for stop in data.get("plan", [])],
+                "skipped": len(data.get("skipped", []))
+            })
+            return passed
+        except Exception as e:
+            logger.error(f"Itinerary endpoint test failed: {e}")
+            self.log_test_result("Itinerary Endpoint", False, {"error": str(e)})
+            return False
+
+    def test_group_schedule_endpoint(self):
+        """Test the group consensus schedule"""
+        try:
+            response = self.session.get(
+                f"{BASE_URL}/groups/{self.test_group_id}/schedule",
+                params={"members": [self.test_user_id]}
+            )
+            response.raise_for_status()
+            data = response.json()
+            
+            passed = data.get("members") == 1 and "shared_sets" in data and "itinerary" in data
+            self.log_test_result("Group Schedule Endpoint", passed, {
+                "shared_sets": [(s["name"], s["count"]) for s in data.get("shared_sets", [])],
+                "itinerary": [s["name"] for s in data.get("itinerary", [])]
+            })
+            return passed
+        except Exception as e:
+            logger.error(f"Group schedule endpoint test failed: {e}")
+            self.log_test_result("Group Schedule Endpoint", False, {"error": str(e)})
+            return False
+
     def test_drink_round_endpoint(self):
         """Test the drink round endpoint"""
         try:
@@ -226,7 +453,7 @@ class BarefootBuddyTester:
             response.raise_for_status()
             data = response.json()
             
-            passed = "messages" in data and isinstance(data["messages"], list)
+            passed = "messages" in data and isinstance(data["messages"], list) and "next_cursor" in data
             if passed:
                 # Should have at least 2 messages (user + bot)
                 passed = len(data["messages"]) >= 2
@@ -241,6 +468,30 @@ class BarefootBuddyTester:
             self.log_test_result("Chat History", False, {"error": str(e)})
             return False
             
+    def test_chat_search(self):
+        """Test full-text search over chat history"""
+        try:
+            response = self.session.get(
+                f"{BASE_URL}/chat/search",
+                params={"user_id": self.test_user_id, "q": "festival weather"}
+            )
+            response.raise_for_status()
+            data = response.json()
+            
+            passed = "results" in data and isinstance(data["results"], list)
+            if passed and data["results"]:
+                passed = all(field in data["results"][0] for field in ["session_id", "snippet", "score"])
+            
+            self.log_test_result("Chat Search", passed, {
+                "result_count": len(data.get("results", [])),
+                "top_result": data["results"][0] if data.get("results") else None
+            })
+            return passed
+        except Exception as e:
+            logger.error(f"Chat search test failed: {e}")
+            self.log_test_result("Chat Search", False, {"error": str(e)})
+            return False
+            
     def test_function_calling_weather(self):
         """Test function calling for weather queries"""
         if not self.chat_session_id:
@@ -538,17 +789,28 @@ class BarefootBuddyTester:
         
         # Basic endpoints
         self.test_health_endpoint()
+        self.test_metrics_endpoint()
         
         # Festival data endpoints
         self.test_weather_endpoint()
+        self.test_weather_forecast_endpoint()
+        self.test_weather_alerts_endpoint()
+        self.test_weather_point_endpoint()
         self.test_artists_endpoint()
+        self.test_artists_not_modified()
+        self.test_artist_search()
         self.test_artist_starring()
+        self.test_user_favorites()
+        self.test_schedule_endpoints()
+        self.test_itinerary_endpoint()
+        self.test_group_schedule_endpoint()
         self.test_drink_round_endpoint()
         
         # Chat endpoints
         self.test_chat_session_creation()
         self.test_chat_messaging()
         self.test_chat_history()
+        self.test_chat_search()
         
         # Location endpoints
         self.test_location_update()
@@ -557,6 +819,9 @@ class BarefootBuddyTester:
         self.test_presence_update()
         self.test_group_presence()
         
+        # Chat call ledger (after the chat tests have produced some calls)
+        self.test_llm_metrics_endpoint()
+        
         # WebSocket test (async)
         asyncio.run(self.test_websocket_connection())
         
@@ -14,7 +14,14 @@ const DaisyDukeBotChat = () => {
   const [sessionId, setSessionId] = useState(null);
   const [initializing, setInitializing] = useState(true);
   const messagesEndRef = useRef(null);
-  const userId = 'user_' + Math.random().toString(36).substr(2, 9);
+  // Stable across renders and mounts so the backend resumes the same session
+  const [userId] = useState(() => {
+    const stored = localStorage.getItem('userName') || localStorage.getItem('chatUserId');
+    if (stored) return stored;
+    const generated = 'user_' + Math.random().toString(36).substr(2, 9);
+    localStorage.setItem('chatUserId', generated);
+    return generated;
+  });
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
@@ -102,10 +109,22 @@ const DaisyDukeBotChat = () => {
     try {
       if (sessionId && sessionId !== 'local_session') {
         // Send message to real API
-        const response = await axios.post(
-          `${API_BASE_URL}/chat/${sessionId}?user_id=${userId}`,
-          { message: currentMessage }
-        );
+        let response;
+        try {
+          response = await axios.post(
+            `${API_BASE_URL}/chat/${sessionId}?user_id=${userId}`,
+            { message: currentMessage }
+          );
+        } catch (error) {
+          if (error.response?.status !== 410) throw error;
+          // Session was archived while idle; carry on in a fresh one
+          const session = await axios.post(`${API_BASE_URL}/chat/session`, { user_id: userId });
+          setSessionId(session.data.session_id);
+          response = await axios.post(
+            `${API_BASE_URL}/chat/${session.data.session_id}?user_id=${userId}`,
+            { message: currentMessage }
+          );
+        }
 
         const botResponse = response.data;
         setMessages(prev => [...prev, botResponse]);
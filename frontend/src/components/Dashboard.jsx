@@ -25,7 +25,6 @@ const API_BASE_URL = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001
 
 const Dashboard = ({ setActiveTab }) => {
   const [weather, setWeather] = useState(null);
-  const [artists, setArtists] = useState([]);
   const [drinkRound, setDrinkRound] = useState(null);
   const [nextFavorite, setNextFavorite] = useState(null);
   const [currentArtist, setCurrentArtist] = useState(null);
@@ -49,11 +48,14 @@ const Dashboard = ({ setActiveTab }) => {
       console.log('Weather response:', weatherResponse.data);
       setWeather(weatherResponse.data);
 
-      // Fetch artists data
-      console.log('Fetching artists...');
-      const artistsResponse = await axios.get(`${API_BASE_URL}/artists`);
-      console.log('Artists response:', artistsResponse.data);
-      setArtists(artistsResponse.data.artists || []);
+      // Fetch the current or next starred set
+      console.log('Fetching next favorite...');
+      const scheduleResponse = await axios.get(`${API_BASE_URL}/schedule/next`, {
+        params: { user_id: localStorage.getItem('userName') || 'anonymous' }
+      });
+      console.log('Next favorite response:', scheduleResponse.data);
+      setCurrentArtist(scheduleResponse.data.playing[0] || null);
+      setNextFavorite(scheduleResponse.data.next);
 
       // Fetch drink round data
       console.log('Fetching drink round...');
@@ -87,32 +89,6 @@ const Dashboard = ({ setActiveTab }) => {
     }
   };
 
-  useEffect(() => {
-    if (artists.length > 0) {
-      // Find next favorite or current artist
-      const now = new Date();
-      const starredArtists = artists.filter(artist => artist.isStarred);
-      
-      // Find currently playing starred artist
-      const playing = starredArtists.find(artist => {
-        const start = new Date(artist.startTime);
-        const end = new Date(artist.endTime);
-        return now >= start && now <= end;
-      });
-
-      if (playing) {
-        setCurrentArtist(playing);
-      } else {
-        // Find next upcoming starred artist
-        const upcoming = starredArtists
-          .filter(artist => new Date(artist.startTime) > now)
-          .sort((a, b) => new Date(a.startTime) - new Date(b.startTime))[0];
-        
-        setNextFavorite(upcoming);
-      }
-    }
-  }, [artists]);
-
   const getTimeUntil = (startTime) => {
     const now = new Date();
     const start = new Date(startTime);
@@ -180,7 +156,7 @@ const Dashboard = ({ setActiveTab }) => {
                 </div>
                 <div className="flex items-center gap-2">
                   <Sun className="h-4 w-4 text-orange-400" />
-                  <span className="readable-subtitle">UV Index: {weather.uvIndex}</span>
+                  <span className="readable-subtitle">UV Index: {weather.uvIndex ?? '--'}</span>
                 </div>
               </div>
             </div>
@@ -30,13 +30,21 @@ const SetlistScheduler = () => {
   const fetchArtists = async () => {
     try {
       setLoading(true);
-      const response = await axios.get(`${API_BASE_URL}/artists`);
-      const artistsData = response.data.artists || [];
+      const userId = localStorage.getItem('userName') || 'anonymous';
+      // The shared lineup is served pre-encoded (and gzipped); stars come separately and are merged here
+      const [lineupResponse, favoritesResponse] = await Promise.all([
+        axios.get(`${API_BASE_URL}/artists`),
+        axios.get(`${API_BASE_URL}/users/${encodeURIComponent(userId)}/favorites`)
+      ]);
+      const starred = new Set(favoritesResponse.data.artist_ids || []);
+      const artistsData = (lineupResponse.data.artists || []).map(artist => ({
+        ...artist,
+        isStarred: starred.has(artist.id)
+      }));
       
       setArtists(artistsData);
       
       // Track locally starred artists
-      const starred = new Set(artistsData.filter(artist => artist.isStarred).map(artist => artist.id));
       setStarredArtists(starred);
       
     } catch (error) {
@@ -67,7 +75,9 @@ const SetlistScheduler = () => {
       ));
 
       // Send to API
-      await axios.post(`${API_BASE_URL}/artists/${artistId}/star`);
+      await axios.post(`${API_BASE_URL}/artists/${artistId}/star`, null, {
+        params: { user_id: localStorage.getItem('userName') || 'anonymous' }
+      });
       
     } catch (error) {
       console.error('Error toggling star:', error);
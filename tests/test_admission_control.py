@@ -0,0 +1,97 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import pytest
+
+from admission_control import AdmissionController, AdmissionRejected
+
+
+def test_queued_users_are_served_round_robin():
+    async def scenario():
+        admission = AdmissionController(max_concurrent=1, max_queue=10, user_rate=1, user_burst=10)
+        await admission.acquire("holder")
+        order = []
+
+        async def ask(user_id):
+            await admission.acquire(user_id)
+            order.append(user_id)
+            admission.release()
+
+        # "alice" queues three requests before "bob" and "carol" queue one each
+        tasks = [asyncio.create_task(ask(user)) for user in ["alice", "alice", "alice", "bob", "carol"]]
+        await asyncio.sleep(0)
+        admission.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["alice", "bob", "carol", "alice", "alice"]
+
+
+def test_queue_timeout_is_rejected_and_leaves_the_queue():
+    async def scenario():
+        admission = AdmissionController(max_concurrent=1, max_queue=10, max_wait=0.01)
+        await admission.acquire("holder")
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire("waiter")
+        return admission, rejected.value
+
+    admission, rejected = asyncio.run(scenario())
+    assert rejected.reason == "queue_timeout"
+    assert rejected.retry_after >= 1
+    assert admission.stats()["queued"] == 0
+    assert admission.stats()["active"] == 1
+
+
+def test_cancelled_waiter_does_not_take_a_slot():
+    async def scenario():
+        admission = AdmissionController(max_concurrent=1, max_queue=10)
+        await admission.acquire("holder")
+        waiter = asyncio.create_task(admission.acquire("waiter"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        queued = admission.stats()["queued"]
+        admission.release()
+        return queued, admission.stats()
+
+    queued, stats = asyncio.run(scenario())
+    assert queued == 0
+    assert stats["active"] == 0
+
+
+def test_full_queue_does_not_spend_a_token():
+    async def scenario():
+        admission = AdmissionController(max_concurrent=1, max_queue=1, user_rate=0.001, user_burst=1)
+        await admission.acquire("holder")
+        waiter = asyncio.create_task(admission.acquire("other"))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire("shed")
+        assert rejected.value.reason == "queue_full"
+        admission.release()
+        await waiter
+        admission.release()
+        # "shed" still has its only token
+        await admission.acquire("shed")
+
+    asyncio.run(scenario())
+
+
+def test_try_acquire_never_jumps_the_queue():
+    async def scenario():
+        admission = AdmissionController(max_concurrent=2, max_queue=10)
+        assert admission.try_acquire()
+        assert admission.try_acquire()
+        assert not admission.try_acquire()
+        waiter = asyncio.create_task(admission.acquire("waiter"))
+        await asyncio.sleep(0)
+        admission.release()
+        # The freed slot went to the queued user, not to a spare-slot caller
+        assert not admission.try_acquire()
+        await waiter
+
+    asyncio.run(scenario())
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import pytest
+
+from intent_router import IntentRouter, NOW_PLAYING, WEATHER, weather_period
+
+
+@pytest.fixture
+def router():
+    return IntentRouter(db=None)
+
+
+@pytest.mark.parametrize("message", [
+    "What's the weather like?",
+    "How's the temperature at the festival?",
+    "Is it going to rain tonight?",
+    "any rain tomorrow",
+    "Is it cold outside?",
+    "it's hot today",
+    "is it getting chilly out there",
+    "How hot is it right now?",
+    "Is it hot?",
+])
+def test_weather_questions_are_routed(router, message):
+    assert router.classify(message) == WEATHER
+
+
+@pytest.mark.parametrize("message", [
+    "How much is a hot dog?",
+    "How do I keep my drinks cold?",
+    "Where can I buy a rain poncho?",
+    "Is there a rain poncho stand?",
+    "Where can I get a cold beer?",
+    "Is it a hot dog stand or tacos?",
+    "How much does a sunny side up breakfast cost?",
+])
+def test_non_weather_questions_fall_through(router, message):
+    assert router.classify(message) is None
+
+
+@pytest.mark.parametrize("message", [
+    "What is on tap now?",
+    "What is on sale right now?",
+])
+def test_on_without_a_stage_is_not_now_playing(router, message):
+    assert router.classify(message) != NOW_PLAYING
+
+
+# Friday 2025-06-20, 3 PM at the festival
+NOW = datetime(2025, 6, 20, 15, 0)
+
+
+@pytest.mark.parametrize("message, label, start, end", [
+    ("is it going to rain tonight", "tonight", datetime(2025, 6, 20, 18), datetime(2025, 6, 21)),
+    ("any rain tomorrow", "tomorrow", datetime(2025, 6, 21, 8), datetime(2025, 6, 22)),
+    ("will it rain tomorrow morning", "tomorrow morning", datetime(2025, 6, 21, 6), datetime(2025, 6, 21, 12)),
+    ("weather on sunday", "sunday", datetime(2025, 6, 22, 8), datetime(2025, 6, 23)),
+    ("will it rain", "over the next few hours", NOW, NOW + timedelta(hours=6)),
+])
+def test_weather_period(message, label, start, end):
+    assert weather_period(message, NOW) == (label, start, end)
+
+
+def test_current_weather_has_no_period():
+    assert weather_period("what's the weather like", NOW) is None
+
+
+class FakeForecast:
+    def __init__(self, start, hours):
+        self.start, self.hours = start, hours
+
+    def at(self, when):
+        index = int((when - self.start).total_seconds() // 3600)
+        if not 0 <= index < len(self.hours):
+            return None
+        temperature, rain = self.hours[index]
+        return {"temperature": temperature, "precipitationProbability": rain}
+
+
+class FakeWeather:
+    def __init__(self, forecast):
+        self.forecast = forecast
+
+    async def get_current_weather(self):
+        return {"temperature": 80, "description": "Clear Sky", "windSpeed": 5, "daisyComment": ""}
+
+
+def test_future_weather_is_answered_from_the_forecast(monkeypatch):
+    monkeypatch.setattr("intent_router.festival_now", lambda: NOW)
+    forecast = FakeForecast(datetime(2025, 6, 20), [(70 + h % 5, 10 * (h % 7)) for h in range(72)])
+    router = IntentRouter(db=None, weather_service=FakeWeather(forecast))
+    reply = asyncio.run(router._answer_weather("is it going to rain tonight"))
+    assert reply.startswith("Tonight it's lookin' like 70-74°F with up to a 60% chance of rain")
+
+
+def test_future_weather_outside_the_forecast_goes_to_the_model(monkeypatch):
+    monkeypatch.setattr("intent_router.festival_now", lambda: NOW)
+    router = IntentRouter(db=None, weather_service=FakeWeather(FakeForecast(datetime(2025, 6, 20), [(70, 0)] * 24)))
+    assert asyncio.run(router._answer_weather("any rain tomorrow")) is None
+    router.weather_service.forecast = None
+    assert asyncio.run(router._answer_weather("is it going to rain tonight")) is None
@@ -0,0 +1,76 @@
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from itertools import combinations
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import pytest
+
+from itinerary import plan_itinerary
+from schedule_index import ScheduledSet
+
+DAY = datetime(2025, 6, 20, 12, 0)
+STAGES = ["Main Stage", "Beach Stage", "Patrón Tequila Stage"]
+
+
+def make_set(artist_id, stage, start_minutes, length_minutes):
+    start = DAY + timedelta(minutes=start_minutes)
+    return ScheduledSet({
+        "id": artist_id,
+        "name": artist_id,
+        "stage": stage,
+        "startTime": start.isoformat(),
+        "endTime": (start + timedelta(minutes=length_minutes)).isoformat()
+    })
+
+
+def feasible(plan, walk_minutes):
+    walk = timedelta(minutes=walk_minutes)
+    ordered = sorted(plan, key=lambda s: s.start)
+    return all(
+        current.start >= previous.end + (walk if previous.stage != current.stage else timedelta())
+        for previous, current in zip(ordered, ordered[1:])
+    )
+
+
+def score(plan, priorities):
+    return sum(priorities.get(s.id, 1) * int((s.end - s.start).total_seconds() // 60) for s in plan)
+
+
+def brute_force(sets, priorities, walk_minutes):
+    return max(
+        (score(plan, priorities)
+         for size in range(len(sets) + 1)
+         for plan in combinations(sets, size)
+         if feasible(plan, walk_minutes)),
+        default=0
+    )
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_plan_matches_brute_force(seed):
+    rng = random.Random(seed)
+    sets = [
+        make_set(f"a{i}", rng.choice(STAGES), rng.randrange(0, 600, 5), rng.randrange(15, 120, 5))
+        for i in range(rng.randint(0, 9))
+    ]
+    priorities = {s.id: 3 for s in sets if rng.random() < 0.3}
+    walk_minutes = rng.choice([0, 10, 25])
+
+    plan, plan_score = plan_itinerary(sets, priorities, walk_minutes)
+
+    assert feasible(plan, walk_minutes)
+    assert plan_score == score(plan, priorities)
+    assert plan_score == brute_force(sets, priorities, walk_minutes)
+
+
+def test_walking_time_rules_out_a_tight_stage_change():
+    first = make_set("first", "Main Stage", 0, 60)
+    same_stage = make_set("same", "Main Stage", 60, 30)
+    other_stage = make_set("other", "Beach Stage", 65, 40)
+
+    plan, _ = plan_itinerary([first, same_stage, other_stage], {}, walk_minutes=10)
+
+    assert [s.id for s in plan] == ["first", "same"]
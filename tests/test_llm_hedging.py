@@ -0,0 +1,102 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from admission_control import AdmissionController
+from llm_hedging import HedgedCompletions
+
+
+class FakeClient:
+    """chat.completions.create that answers after a per-model delay"""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.calls = []
+        self.cancelled = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, **kwargs):
+        self.calls.append(model)
+        try:
+            await asyncio.sleep(self.delays[model])
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        return SimpleNamespace(model=model, usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5))
+
+
+class FakeLedger:
+    def __init__(self):
+        self.calls = []
+
+    def record(self, name, latency_ms, model=None, error=False, lost=False, **usage):
+        self.calls.append((model, error, lost))
+
+
+def hedged(client, **kwargs):
+    return HedgedCompletions(client, hedge_model="fast", default_delay=0.01, min_delay=0.01, **kwargs)
+
+
+def test_fast_primary_never_hedges():
+    client = FakeClient({"slow": 0.0, "fast": 0.0})
+    result = asyncio.run(hedged(client).create("chat", model="slow"))
+    assert result.model == "slow"
+    assert client.calls == ["slow"]
+
+
+def test_hedge_wins_and_the_primary_is_recorded_as_lost():
+    async def scenario():
+        client, ledger = FakeClient({"slow": 1.0, "fast": 0.02}), FakeLedger()
+        result = await hedged(client, ledger=ledger).create("chat", model="slow")
+        await asyncio.sleep(0)
+        return client, ledger, result
+
+    client, ledger, result = asyncio.run(scenario())
+    assert result.model == "fast"
+    assert client.calls == ["slow", "fast"]
+    assert client.cancelled == ["slow"]
+    assert sorted(ledger.calls) == [("fast", False, False), ("slow", False, True)]
+
+
+def test_primary_wins_and_the_hedge_is_cancelled():
+    async def scenario():
+        client, ledger = FakeClient({"slow": 0.03, "fast": 1.0}), FakeLedger()
+        result = await hedged(client, ledger=ledger).create("chat", model="slow")
+        await asyncio.sleep(0)
+        return client, ledger, result
+
+    client, ledger, result = asyncio.run(scenario())
+    assert result.model == "slow"
+    assert client.cancelled == ["fast"]
+    assert sorted(ledger.calls) == [("fast", False, True), ("slow", False, False)]
+
+
+def test_hedge_holds_its_own_admission_slot():
+    async def scenario():
+        admission = AdmissionController(max_concurrent=2)
+        await admission.acquire("user")
+        client = FakeClient({"slow": 1.0, "fast": 0.02})
+        result = await hedged(client, admission=admission).create("chat", model="slow")
+        await asyncio.sleep(0)
+        return admission.stats()["active"], result
+
+    active, result = asyncio.run(scenario())
+    assert result.model == "fast"
+    # The hedge's slot is back; only the caller's own slot is still held
+    assert active == 1
+
+
+def test_hedge_is_skipped_without_a_spare_slot():
+    async def scenario():
+        admission = AdmissionController(max_concurrent=1)
+        await admission.acquire("user")
+        client = FakeClient({"slow": 0.03, "fast": 0.0})
+        result = await hedged(client, admission=admission).create("chat", model="slow")
+        return client, result
+
+    client, result = asyncio.run(scenario())
+    assert result.model == "slow"
+    assert client.calls == ["slow"]